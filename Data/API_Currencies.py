@@ -4,6 +4,10 @@ import requests
 import pandas as pd
 from datetime import datetime, timedelta
 from sqlalchemy import create_engine, MetaData, Table, Column, String, Float, Date
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Python')))
+from utils.fmp import stream_historical
 
 # Parameters
 # ==============================================================================
@@ -45,22 +49,8 @@ else:
 # List for store dataframes of each exchange
 dfs = []
 
-# Iterate over each exchange list
-for i in coin_list:
-    # Get URL data
-    url = f"https://financialmodelingprep.com/api/v3/historical-price-full/{i}?from={p_from}&to={p_to}&apikey={apikey}"
-    response = requests.get(url)
-    data = response.json()
-
-    # Check if there is data
-    if 'historical' not in data:
-        continue
-
-    # Navigate and convert to DataFrame
-    navigate = data['historical']
-    df = pd.DataFrame(navigate)
-    df['symbol'] = i
-
+# Download symbols concurrently (rate limited) and transform each one as it arrives
+for i, df in stream_historical(coin_list, p_from, p_to, apikey):
     # Select and rename columns
     df = df[['symbol', 'date', 'open', 'close', 'low', 'high', 'change', 'changePercent']]
     df.columns = ['symbol', 'date', 'open', 'close', 'low', 'high', 'change', 'changepercent']
@@ -3,7 +3,13 @@
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine, MetaData, Table, Column, String, Float, Date
+from sqlalchemy import create_engine, MetaData, Table, Column, String, Float, Date, SmallInteger
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Python')))
+from utils.http import cache_path
+from utils.fmp import stream_historical, read_state, write_state
+from utils.series import filter_outliers, rolling_stats, derive_metrics
 
 # Parameters
 # ==============================================================================
@@ -41,47 +47,50 @@ else:
 # List for store dataframes of each exchange
 dfs = []
 
-# Iterate over each exchange list
-for i in coin_list:
-    # Get URL data
-    url = f"https://financialmodelingprep.com/api/v3/historical-price-full/{i}?from={p_from}&to={p_to}&apikey={apikey}"
-    response = requests.get(url)
-    data = response.json()
-
-    # Check if there is data
-    if 'historical' not in data:
-        continue
+# Last 300 days of each symbol from the previous run
+state_file = cache_path('fmp', f'{getvalues}_state.pkl')
+state = read_state(state_file)
+tails = []
 
-    # Navigate and convert to DataFrame
-    navigate = data['historical']
-    df = pd.DataFrame(navigate)
-    df['symbol'] = i
+# Today mode only downloads the days after the last run of each symbol
+since = {}
+if getdates == "today":
+    since = {s: (d + timedelta(days=1)).strftime('%Y-%m-%d') for s, d in state['fetched'].items()}
+    coin_list = [s for s in coin_list if since.get(s, p_from) <= p_to]
 
+# Download symbols concurrently (rate limited) and transform each one as it arrives
+for i, df in stream_historical(coin_list, p_from, p_to, apikey, since=since):
     # Format and sort by date 
     df['date'] = pd.to_datetime(df['date'])
     df = df.sort_values(by='date')
 
-    # Filtering outliers (test)
-    for _ in range(10):
-        df['changepercent'] = abs((df['close'] / df['close'].shift(1)) - 1)
-        df = df.loc[df['changepercent'].abs() < 0.8]
+    # Filtering outliers: closes 80% away from the last accepted one (10 days in a row make a new level)
+    previous = {None: state['filter'][i]} if i in since and i in state['filter'] else None
+    keep, previous = filter_outliers(df['close'], lower=0.2, upper=1.8, patience=10, state=previous)
+    df = df[keep]
+
+    # State up to the last accepted day: rejected days after it are downloaded and filtered
+    # again on the next run, when later days show whether they were spikes or a new level
+    if len(df):
+        state['filter'][i] = (previous[None][0], 0)
+        state['fetched'][i] = df['date'].iloc[-1]
+
+    # Stored days in front of the new ones give the moving averages their history
+    history = state['rows'][state['rows']['symbol'] == i] if i in since else state['rows'].iloc[:0]
+    if len(history):
+        df = pd.concat([history, df], ignore_index=True)
     
     # Set index and fill empty
     df = df.set_index('date')
     df = df.asfreq('D').ffill()
     df = df.reset_index()
+    tails.append(df.tail(300))
 
     # Add moving average columns
-    df['ma10'] = df['close'].rolling(window=10, min_periods=1).mean()
-    df['ma20'] = df['close'].rolling(window=20, min_periods=1).mean()
-    df['ma50'] = df['close'].rolling(window=50, min_periods=1).mean()
-    df['ma100'] = df['close'].rolling(window=100, min_periods=1).mean()
-    df['ma200'] = df['close'].rolling(window=200, min_periods=1).mean()
-    df['ma300'] = df['close'].rolling(window=300, min_periods=1).mean()
-    df['open'] = df.groupby('symbol')['close'].shift(1).fillna(df['open'])
-    df['change'] = df['close'] - df['open']
-    df['changepercent'] = (df['close'] - df['open']) / df['open']
-    df['changesign'] = df['change'].apply(lambda x: '+' if x > 0 else '-' if x < 0 else '=')
+    df = df.join(rolling_stats(df['close'], [10, 20, 50, 100, 200, 300]))
+
+    # Change against the previous close (the first day against its open), sign code and decimals
+    df = derive_metrics(df, 'close', open='open')
 
     # Select and rename columns
     df = df[['symbol', 'date', 'open', 'close', 'low', 'high', 'volume', 'change', 'changepercent', 'changesign', 'ma10', 'ma20', 'ma50', 'ma100', 'ma200', 'ma300']]
@@ -89,22 +98,11 @@ for i in coin_list:
 
     # Format columns
     df['date'] = pd.to_datetime(df['date']).dt.date
-    df['open'] = df['open'].astype(float).round(5)
-    df['close'] = df['close'].astype(float).round(5)
-    df['low'] = df['low'].astype(float).round(5)
-    df['high'] = df['high'].astype(float).round(5)
-    df['volume'] = df['volume'].astype(float).round(0)
-    df['change'] = df['change'].astype(float).round(5)
-    df['changepercent'] = df['changepercent'].astype(float).round(5)
-    df['ma10'] = df['ma10'].astype(float).round(5)
-    df['ma20'] = df['ma20'].astype(float).round(5)
-    df['ma50'] = df['ma50'].astype(float).round(5)
-    df['ma100'] = df['ma100'].astype(float).round(5)
-    df['ma200'] = df['ma200'].astype(float).round(5)
-    df['ma300'] = df['ma300'].astype(float).round(5)
-
-    # Conditional filter for today or range dataset
-    if getdates == "today":
+
+    # Conditional filter for today or range dataset (days after the stored ones, else p_to only)
+    if getdates == "today" and len(history):
+        df = df[df['date'] > history['date'].max().date()]
+    elif getdates == "today":
         df = df[df['date'] == datetime.strptime(p_to, '%Y-%m-%d').date()]
 
     # Add datafram to list
@@ -145,7 +143,7 @@ exchange_table = Table(
     Column('volume', Float),
     Column('change', Float),
     Column('changepercent', Float),
-    Column('changesign', Float),
+    Column('changesign', SmallInteger),
     Column('ma10', Float),
     Column('ma20', Float),
     Column('ma50', Float),
@@ -159,7 +157,10 @@ metadata.create_all(engine)
 
 # Insert DataFrame to SQL Server
 with engine.connect() as connection:
-    df.to_sql(table_name, con=connection, if_exists='replace', index=False)
+    df.to_sql(table_name, con=connection, if_exists='append' if getdates == "today" else 'replace', index=False)
+
+# Save state for the next run (only once the rows are stored)
+write_state(state_file, state, tails)
 
 # Show result
 print(df)
@@ -2,10 +2,13 @@
 # ==============================================================================
 import requests
 import pandas as pd
-import json
-import re
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine, MetaData, Table, Column, String, Float, Date
+from sqlalchemy import create_engine, MetaData, Table, Column, String, Float, Date, SmallInteger
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Python')))
+from utils.exchangerate import load_timeframe
+from utils.series import filter_outliers, rolling_stats, densify, derive_metrics
 
 # Currency List
 #=============================================================================================
@@ -20,7 +23,6 @@ data_list = response_list.json()
 # Extract currencies from JSON
 currencies = data_list.get('currencies', {})
 currency_codes = list(currencies.keys())
-currency_string = ','.join(currency_codes)
 
 # Currency Rates
 #=============================================================================================
@@ -28,40 +30,8 @@ currency_string = ','.join(currency_codes)
 start_year = 1999
 end_year = 2024
 
-# API URL exchange currency rates
-url_timeframe = f"http://api.exchangerate.host/timeframe?access_key={apikey}"
-
-# List to save data
-rows = []
-
-# Iterate over each year
-for year in range(start_year, end_year +1):
-
-    params = {
-            'start_date': f"{year}-01-01",
-            'end_date': f"{year}-12-31",
-            'source': 'EUR',
-            'currencies': currency_string
-        }
-
-    # Request API data
-    response_timeframe = requests.get(url_timeframe, params=params)
-    response_text = response_timeframe.text
-    json_match = re.search(r'\{.*\}', response_text)
-    json_text = json_match.group(0)
-    data = json.loads(json_text)
-
-    # Iterate over each date and currency
-    for date, rates in data.get('quotes', {}).items():
-        if isinstance(rates, dict):
-            for symbol, rate in rates.items():
-                rows.append({
-                    'symbol': symbol,
-                    'date': date,
-                    'rate': rate
-                })
-
-df = pd.DataFrame(rows)
+# Download year windows concurrently (resumes from the checkpoint) into columnar arrays
+df = load_timeframe(range(start_year, end_year + 1), apikey, currency_codes, source='EUR')
 
 # Filtering outliers
 #=============================================================================================
@@ -69,45 +39,25 @@ df = pd.DataFrame(rows)
 df['date'] = pd.to_datetime(df['date'])
 df = df.sort_values(['symbol', 'date'])
 
-# Iterate each symbol
-for _ in range(3):
-    df['changepercent'] = df.groupby('symbol')['rate'].transform(lambda x: x.pct_change() +1)
-    df = df.loc[((df['changepercent'] > 0.8) & (df['changepercent'] < 1.25)) | (df['changepercent'].isna())]
-    
-df = df[['symbol', 'date', 'rate']]
+# Rates out of (0.8, 1.25) times the last accepted one of each symbol (3 days in a row make a new level)
+keep, _ = filter_outliers(df['rate'], df['symbol'], lower=0.8, upper=1.25, patience=3)
+df = df.loc[keep, ['symbol', 'date', 'rate']]
 
 # Getting a daily frequency
 #=============================================================================================
-# Create an empty dataframe
-df = df.set_index('date')
-df = df.groupby('symbol').resample('D').ffill().reset_index(level=0, drop=True)
-df = df.reset_index()
+# One row per symbol and day, sorted by symbol and date
+df = densify(df, 'symbol', 'date')
 
 # Transformation data
 #=============================================================================================
-# Get variations
-df['change'] = df.groupby('symbol')['rate'].diff()
-df['changepercent'] = df.groupby('symbol')['rate'].transform(lambda x: x.pct_change())
-df['changesign'] = df['change'].apply(lambda x: '+' if x > 0 else '-' if x < 0 else '=')
-
-# Add moving average columns
-df['ma10'] = df.groupby('symbol')['rate'].transform(lambda x: x.rolling(window=10, min_periods=1).mean())
-df['ma20'] = df.groupby('symbol')['rate'].transform(lambda x: x.rolling(window=20, min_periods=1).mean())
-df['ma50'] = df.groupby('symbol')['rate'].transform(lambda x: x.rolling(window=50, min_periods=1).mean())
-df['ma100'] = df.groupby('symbol')['rate'].transform(lambda x: x.rolling(window=100, min_periods=1).mean())
-df['ma200'] = df.groupby('symbol')['rate'].transform(lambda x: x.rolling(window=200, min_periods=1).mean())
-df['ma300'] = df.groupby('symbol')['rate'].transform(lambda x: x.rolling(window=300, min_periods=1).mean())
+# Add moving average columns (rows are sorted by symbol and date)
+df = df.join(rolling_stats(df['rate'], [10, 20, 50, 100, 200, 300], df['symbol']))
+
+# Variations against the previous day of each symbol, sign code and decimals
+df = derive_metrics(df, 'rate', group='symbol')
 
 # Formatting data
 df['date'] = pd.to_datetime(df['date']).dt.date
-df['change'] = df['change'].astype(float).round(5)
-df['changepercent'] = df['changepercent'].astype(float).round(5)
-df['ma10'] = df['ma10'].astype(float).round(5)
-df['ma20'] = df['ma20'].astype(float).round(5)
-df['ma50'] = df['ma50'].astype(float).round(5)
-df['ma100'] = df['ma100'].astype(float).round(5)
-df['ma200'] = df['ma200'].astype(float).round(5)
-df['ma300'] = df['ma300'].astype(float).round(5)
 
 # Selection columns
 df = df[['symbol', 'date', 'rate', 'change', 'changepercent', 'changesign', 'ma10', 'ma20', 'ma50', 'ma100', 'ma200', 'ma300']]
@@ -135,7 +85,7 @@ exchange_table = Table(
     Column('Rate', Float),
     Column('Change', Float),
     Column('Changepercent', Float),
-    Column('Changesign', Float),
+    Column('Changesign', SmallInteger),
     Column('MA10', Float),
     Column('MA20', Float),
     Column('MA50', Float),
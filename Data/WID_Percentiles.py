@@ -1,83 +1,72 @@
 # Libraries
 # ===================================================
-import requests
 import os
 import pandas as pd
 import numpy as np
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Python')))
+from utils.countries import load_countries
+from utils.wid import read_wid, write_dataset, parse_percentiles
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction
 # ===================================================
 # Define CSV path
 path = r'C:\Users\guill\Downloads\data'
 
-# List to save dataframe
-list = []
+# Output schema: categorical country, small integers and float32 shares
+schema = {'country': 'category', 'year': np.int16, 'percentile': np.int8, 'wealth': np.float32, 'income': np.float32}
 
-# Iterate over each file
-for archivo in os.listdir(path):
-    if archivo.startswith("WID_data_") and archivo.endswith(".csv"):
-        df = pd.read_csv(os.path.join(path, archivo), delimiter=';')
-        list.append(df)
+# Years after an observation: repeat the previous value (True) or the first one (False)
+fill_trailing = False
 
-# Combine all dataframe
-dfx = pd.concat(list, ignore_index=True)
+# Filter dataframe while reading files in parallel
+variable = ['sdiincj992', 'shwealj992']
+df = read_wid(path, variables=variable, value_dtype=np.float32)
 
 # Data Manipulation
 # ===================================================
-# Filter dataframe
-variable = ['sdiincj992', 'shwealj992']
-df = dfx[dfx['variable'].isin(variable)]
-
-# Clean dataframe
-df = df[~df['percentile'].str.contains(r'\.', na=False)]
-df['dif'] = df['percentile'].str.extract(r'p(\d+)p(\d+)').astype(int).apply(lambda x: x[1] - x[0], axis=1)
-df = df[df['dif'] == 1]
-df['percentile'] = df['percentile'].str.extract(r'p\d+p(\d+)').astype(int)
+# Clean dataframe: whole one-point percentiles, named by their upper bound
+bounds = parse_percentiles(df['percentile'])
+keep = ~bounds['fractional'] & (bounds['width'] == 1)
+df = df[keep]
+df['percentile'] = bounds.loc[keep, 'upper'].astype(np.int8)
 df = df.sort_values(by=['country', 'variable', 'year', 'percentile'])
 df['value'] =  df['value'] * 100
 
 # Pivot dataframe
-df['variable'] = df['variable'].replace({'sdiincj992': 'income', 'shwealj992': 'wealth'}) 
+df['variable'] = df['variable'].cat.rename_categories({'sdiincj992': 'income', 'shwealj992': 'wealth'})
 df = df[['variable', 'country', 'year', 'percentile', 'value']]
-df = df.pivot_table(index=['country', 'year', 'percentile'], columns='variable', values='value')
-df = df.reset_index()
+df = df.pivot_table(index=['country', 'year', 'percentile'], columns='variable', values='value', observed=True)
+df = df.reset_index().astype(schema)
 
 # Expand data from 1950
 countries = df['country'].unique()
-years = np.arange(1950, 2022)
+years = np.arange(1950, 2022, dtype=np.int16)
 percentiles = df['percentile'].unique()
 dfexp = pd.MultiIndex.from_product([countries, years, percentiles], names=['country', 'year', 'percentile']).to_frame(index=False)
+dfexp = dfexp.astype({c: schema[c] for c in ['country', 'year', 'percentile']})
 df = pd.merge(dfexp, df, on=['country', 'year', 'percentile'], how='left')
 
-# DF - First Year Wealth
-dfw = df[df['wealth'].notna()]
-dfw = dfw.groupby(['country'], as_index=False)['year'].min()
-dfw = pd.merge(df, dfw, on=['country', 'year'], how='inner')
-dfw = dfw[['country', 'percentile', 'wealth']]
-dfw = dfw.rename(columns={'wealth': 'wealth_null'})
-
-# DF - First Year Income
-dfi = df[df['income'].notna()]
-dfi = dfi.groupby(['country'], as_index=False)['year'].min()
-dfi = pd.merge(df, dfi, on=['country', 'year'], how='inner')
-dfi = dfi[['country', 'percentile', 'income']]
-dfi = dfi.rename(columns={'income': 'income_null'})
+# Fill nulls in one grouped pass over the (country, percentile) series: each one takes
+# its value at the first year the country has data (backward fill from that year);
+# with fill_trailing, years after an observation repeat the previous value instead
+df = df.sort_values(['country', 'percentile', 'year'], ignore_index=True)
+keys = [df['country'], df['percentile']]
+for column in ['wealth', 'income']:
+    first = df['year'].where(df[column].notna()).groupby(df['country'], observed=True).transform('min')
+    fill = df[column].where(df['year'] == first).groupby(keys, observed=True).transform('first')
+    if fill_trailing:
+        fill = df[column].groupby(keys, observed=True).ffill().fillna(fill)
+    df[column] = df[column].fillna(fill)
 
-# Replace nulls for first values
-df = pd.merge(df, dfw, on=['country', 'percentile'], how='inner')
-df['wealth'] = np.where(df['wealth'].isna(), df['wealth_null'], df['wealth'])
-df = pd.merge(df, dfi, on=['country', 'percentile'], how='inner')
-df['income'] = np.where(df['income'].isna(), df['income_null'], df['income'])
-df = df[['country', 'year', 'percentile', 'wealth', 'income']]
+# Keep countries with both wealth and income data
+df = df[df[['wealth', 'income']].notna().groupby(df['country'], observed=True).transform('any').all(axis=1)]
+df = df[['country', 'year', 'percentile', 'wealth', 'income']].astype(schema)
 
-df.to_parquet(r'C:\Users\guill\Downloads\data\WID_Percentiles.parquet', engine='pyarrow')
+# Save to parquet dataset partitioned by year (add 'country' to partition by country too)
+write_dataset(df, r'C:\Users\guill\Downloads\data\WID_Percentiles', partition_cols=['year'])
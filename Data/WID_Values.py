@@ -1,46 +1,31 @@
 # Libraries
 # ===================================================
-import requests
 import os
-import pandas as pd
 import numpy as np
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Python')))
+from utils.countries import load_countries
+from utils.wid import read_wid, write_dataset
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction
 # ===================================================
 # Define CSV path
 path = r'C:\Users\guill\Downloads\wid_all_data'
 
-# List to save dataframe
-list = []
-
-# Iterate over each file
-for archivo in os.listdir(path):
-    if archivo.startswith("WID_data_") and archivo.endswith(".csv"):
-        df = pd.read_csv(os.path.join(path, archivo), delimiter=';')
-        list.append(df)
-
-# Combine all dataframe
-dfx = pd.concat(list, ignore_index=True)
-
-# Data Manipulation
-# ===================================================
-# Filter dataframe
+# Filter dataframe while reading files in parallel
 variable = ['mgdproi999', 'gdiincj992', 'ghwealj992', 'adiincj992', 'anninci992', 'ahweali992', 'anweali992', 'npopuli999', 'xlceuxi999', 'xlcusxi999', 'wwealni999']
 percentile = ['p0p100']
-df = dfx[dfx['variable'].isin(variable) & dfx['percentile'].isin(percentile)].copy()
+df = read_wid(path, variables=variable, percentiles=percentile)
 
+# Data Manipulation
+# ===================================================
 # Rename variable
-df['variable'] = df['variable'].replace({
+df['variable'] = df['variable'].cat.rename_categories({
     'mgdproi999': 'gdptotal',
     'gdiincj992': 'gincome', 
     'ghwealj992': 'gwealth', 
@@ -55,13 +40,13 @@ df['variable'] = df['variable'].replace({
 df = df[['variable', 'country', 'year', 'value']]
 
 # Unpivot to columns
-df = df.pivot_table(index=['country', 'year'], columns='variable', values='value')
+df = df.pivot_table(index=['country', 'year'], columns='variable', values='value', observed=True)
 df = df.reset_index()
 
 # Select and order columns
 df = df[['country', 'year', 'gdptotal', 'tincome', 'tincome2', 'twealth', 'twealth2', 'gincome', 'gwealth', 'population', 'xeur', 'xusd', 'wiratio']]
 
-# Save to parquet
-df.to_parquet(r'C:\Users\guill\Downloads\WID_Values.parquet', engine='pyarrow')
+# Save to parquet dataset partitioned by year (add 'country' to partition by country too)
+write_dataset(df, r'C:\Users\guill\Downloads\WID_Values', partition_cols=['year'])
 
 print(df)
\ No newline at end of file
@@ -4,58 +4,22 @@ import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
-import requests
-from bs4 import BeautifulSoup
-import re
-from io import StringIO
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.airbnb import load_catalogue, load_listings
 
 # Data Extraction (insideairbnb)
 # ==========================================
-# Extract url pages in a dataframe
-url = "https://insideairbnb.com/get-the-data/"
-response = requests.get(url)
-response.encoding = 'utf-8'
-soup = BeautifulSoup(response.text, 'html.parser')
+# Catalogue of listings (country, province, city, date, url) with the latest snapshot per city
+df_urls = load_catalogue()
 
-# Get unique URLs that contain 'listings.csv'
-listings_urls = set(a['href'] for a in soup.find_all('a', href=True) if a['href'].endswith('listings.csv'))
-
-# Convert the set back to a DataFrame
-df_urls = pd.DataFrame(list(listings_urls), columns=["url"])
-
-# Add city, province and country
-df_urls['city'] = df_urls['url'].apply(lambda x: x.strip('/').split('/')[-4].title() if len(x.strip('/').split('/')) >= 4 else None)
-df_urls['province'] = df_urls['url'].apply(lambda x: x.strip('/').split('/')[-5].title() if len(x.strip('/').split('/')) >= 5 else None)
-df_urls['country'] = df_urls['url'].apply(lambda x: x.strip('/').split('/')[-6].title() if len(x.strip('/').split('/')) >= 6 else None)
-
-# Solve empty values 
-df_urls['country'] = df_urls.apply(lambda row: row['city'] if row['province'] == "Data.Insideairbnb.Com" else row['country'], axis=1)
-df_urls['country'] = df_urls.apply(lambda row: row['province'] if row['country'] == "Data.Insideairbnb.Com" else row['country'], axis=1)
-df_urls['province'] = df_urls.apply(lambda row: row['city'] if row['province'] == "Data.Insideairbnb.Com" else row['province'], axis=1)
-
-# Filter cities and convert to list
+# Filter cities
 cities = {"Girona", "Barcelona", "Amsterdam", "Prague", "Mallorca", "Lisbon", "Malaga", "Athens", "Viena", "Crete", "Florence", "London", "Edinburgh", "Rome", "Paris", "Copenhagen", "Andalucia"}
 df_urls = df_urls[df_urls['city'].isin(cities)]
-urls = df_urls.to_dict(orient='records')
-
-# Create empty list
-dfs = []
-
-# Iterate over each url and city in the list of dictionaries
-for entry in urls:
-    url = entry['url']
-    city = entry['city']
-    province = entry['province']
-    country = entry['country']
-    response = requests.get(url)
-    df = pd.read_csv(StringIO(response.text), encoding='utf-8')
-    df['city'] = city
-    df['province'] = province
-    df['country'] = country
-    dfs.append(df)
-
-# Concatenate dataframes
-df = pd.concat(dfs, axis=0, ignore_index=True)
+
+# Download the listings of every city concurrently (id, host_id, host_name and license)
+df = load_listings(df_urls[['city', 'province', 'country', 'url']])
 
 # Data Manipulation
 # ==========================================
@@ -81,7 +45,7 @@ df = df.rename(columns={'id': 'property', 'license_category': 'license'})
 
 # Calculate percents
 df['side'] = np.where(df['host_category'].isin(['1', '2']), 'left', 'right')
-df['property_percent'] = df['property'] / df.groupby('city')['property'].transform('sum') * 100
+df['property_percent'] = df['property'] / df.groupby('city', observed=True)['property'].transform('sum') * 100
 df['property_percent'] *= df['side'].eq('left').map({True: -1, False: 1})
 
 # Pivot columns
@@ -1,62 +1,40 @@
 # Libraries
 # =====================================================================
-import requests
 import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import matplotlib.ticker as ticker
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.imf import fetch_imf
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction (IMF)
 # =====================================================================
 #Parametro
 parameters = ['NGDPD', 'CG_DEBT_GDP', 'GG_DEBT_GDP', 'HH_LS', 'NFC_LS']
 
-# Create an empty list
-records = []
-
-# Iterar sobre cada parámetro
-for parameter in parameters:
-    # Request URL
-    url = f"https://www.imf.org/external/datamapper/api/v1/{parameter}"
-    response = requests.get(url)
-    data = response.json()
-    values = data.get('values', {})
-
-    # Iterate over each country and year
-    for country, years in values.get(parameter, {}).items():
-        for year, value in years.items():
-            records.append({
-                'Parameter': parameter,
-                'ISO3': country,
-                'Year': int(year),
-                'Value': float(value)
-            })
-    
-# Create dataframe
-df_imf = pd.DataFrame(records)
+# Download parameters concurrently as a wide (ISO3, Year) dataframe
+df_imf = fetch_imf(parameters)
 
 # Data Manipulation
 # =====================================================================
-# Pivot Parameter to columns and filter nulls
-df = df_imf.pivot(index=['ISO3', 'Year'], columns='Parameter', values='Value').reset_index()
+# Total debt over GDP
+df = df_imf.copy()
 df['DEBTper'] = df[['CG_DEBT_GDP', 'GG_DEBT_GDP']].max(axis=1) + df['HH_LS'].fillna(0) + df['NFC_LS'].fillna(0)
 df['DEBT'] = df['DEBTper'] * df['NGDPD']
 df = df.dropna(subset=['NGDPD', 'DEBTper'], how='any')
 
 # Merge queries
-df = df.merge(df_countries, how='left', left_on='ISO3', right_on='ISO3')
+df = df.join(df_countries, on='ISO3')
 df = df[['ISO3', 'Year', 'NGDPD', 'DEBTper', 'DEBT', 'Region']]
 df = df[df['Region'].notna()]
 
@@ -7,6 +7,11 @@ import io
 import seaborn as sns
 import matplotlib.pyplot as plt
 from ecbdata import ecbdata
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.imf import fetch_imf
 
 # Getting Currencies
 # ==================================================
@@ -62,45 +67,19 @@ df_m2.columns = ['Date', 'M2', 'Unit']
 
 # Getting GDP and Countries
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 #Parametro
 parameters = ['NGDPD']
 
-# Create an empty list
-records = []
-
-# Iterar sobre cada parámetro
-for parameter in parameters:
-    # Request URL
-    url = f"https://www.imf.org/external/datamapper/api/v1/{parameter}"
-    response = requests.get(url)
-    data = response.json()
-    values = data.get('values', {})
-
-    # Iterate over each country and year
-    for country, years in values.get(parameter, {}).items():
-        for year, value in years.items():
-            records.append({
-                'Parameter': parameter,
-                'ISO3': country,
-                'Year': int(year),
-                'Value': float(value)
-            })
-    
-# Create dataframe
-df_imf = pd.DataFrame(records)
+# Download parameters concurrently as a wide (ISO3, Year) dataframe
+df_imf = fetch_imf(parameters)
 df_imf['Date'] = pd.to_datetime(df_imf['Year'].astype(str) + '-01-01')
 
 # Merge dataframes and select columns
-df_imf = df_imf.merge(df_countries, how='left', left_on='ISO3', right_on='ISO3')
-df_imf = df_imf[['Date', 'Cod_Currency', 'Value']]
+df_imf = df_imf.join(df_countries, on='ISO3')
+df_imf = df_imf[['Date', 'Cod_Currency', 'NGDPD']]
 df_imf.columns = ['Date', 'Unit', 'GDP']
 
 # Filter currencies and grouping countries
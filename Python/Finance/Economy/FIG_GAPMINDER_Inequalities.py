@@ -1,6 +1,5 @@
 # Libraries
 # =====================================================================
-import requests
 import pandas as pd
 import numpy as np
 import seaborn as sns
@@ -8,16 +7,16 @@ import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import matplotlib.ticker as ticker
 from matplotlib.lines import Line2D
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.series import interpolate_panel
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'iso3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction (GAPMINDER)
 # ====================================================================
@@ -37,24 +36,11 @@ dfgap = dfgap[dfgap['year'] == 2023]
 # Copy Dataframe
 df = dfgap.copy()
 
-# Create a list
-dfs = []
-
-# Interpolate monthly data
-for iso3 in df['iso3'].unique():
-    temp_df = df[df['iso3'] == iso3].copy()
-    temp_df['date'] = pd.to_datetime(temp_df['year'], format='%Y')
-    temp_df = temp_df[['date', 'pop', 'gdpc']]
-    temp_df = temp_df.set_index('date').resample('ME').mean().interpolate(method='linear').reset_index()
-    temp_df['iso3'] = iso3
-    temp_df['year'] = temp_df['date'].dt.year 
-    dfs.append(temp_df)
-
-# Concat dataframes    
-df = pd.concat(dfs, ignore_index=True)
+# Interpolate monthly data of every country at once
+df = interpolate_panel(df, 'iso3', 'year', ['pop', 'gdpc'], date='date')
 
 # Merge queries
-df = df.merge(df_countries, how='left', left_on='iso3', right_on='iso3')
+df = df.join(df_countries, on='iso3')
 df = df[['iso3', 'Country', 'Region', 'year', 'date', 'pop', 'gdpc']]
 df = df[df['Region'].notna()]
 
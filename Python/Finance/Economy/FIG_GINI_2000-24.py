@@ -1,86 +1,46 @@
 # Libraries
 # =====================================================================
-import requests
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.imf import fetch_imf
+from utils.inequality import spread_distribution, lorenz
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction (IMF)
 # =====================================================================
 #Parametro
 parameters = ['LP', 'NGDPDPC']
 
-# Create an empty list
-records = []
-
-# Iterar sobre cada parámetro
-for parameter in parameters:
-    # Request URL
-    url = f"https://www.imf.org/external/datamapper/api/v1/{parameter}"
-    response = requests.get(url)
-    data = response.json()
-    values = data.get('values', {})
-
-    # Iterate over each country and year
-    for country, years in values.get(parameter, {}).items():
-        for year, value in years.items():
-            records.append({
-                'Parameter': parameter,
-                'ISO3': country,
-                'Year': int(year),
-                'Value': float(value)
-            })
-    
-# Create dataframe
-df_imf = pd.DataFrame(records)
+# Download parameters concurrently as a wide (ISO3, Year) dataframe
+df_imf = fetch_imf(parameters)
 
 # Data Manipulation
 # =====================================================================
-# Pivot Parameter to columns and filter nulls
-df = df_imf.pivot(index=['ISO3', 'Year'], columns='Parameter', values='Value').reset_index()
+# Filter nulls
+df = df_imf.copy()
 df = df.dropna(subset=['LP', 'NGDPDPC'], how='any')
 
 # Merge queries
-df = df.merge(df_countries, how='left', left_on='ISO3', right_on='ISO3')
+df = df.join(df_countries, on='ISO3')
 df = df[['ISO3', 'Country', 'Year', 'LP', 'NGDPDPC', 'Analytical', 'Region']]
 df = df[df['Region'].notna()]
 
 # Filter nulls and order
 df = df.sort_values(by=['Year', 'NGDPDPC'])
 
-# Copy a df sample to calculate a median
-columns = df.columns
-df = np.repeat(df.values, df['LP'].astype(int), axis=0)
-df = pd.DataFrame(df, columns=columns)
-
-# Function to create a new distribution
-def distribution(df):
-    average = df['NGDPDPC'].mean()
-    inequality = np.geomspace(1, 10, len(df))
-    df['NGDPDPC_Dis'] = inequality * (average / np.mean(inequality))
-    
-    return df
-
-df = df.groupby(['Country', 'Year']).apply(distribution).reset_index(drop=True)
-
-# Function to calculate Global GINI
-def gini(x):
-    x = np.array(x)
-    x = np.sort(x)
-    n = len(x)
-    gini_index = (2 * np.sum(np.arange(1, n + 1) * x) - (n + 1) * np.sum(x)) / (n * np.sum(x))
-    return gini_index
+# Spread each country into a geomspace(1, 10) distribution, weighted by population
+df = spread_distribution(df, mean='NGDPDPC', population='LP')
+df = df.rename(columns={'value': 'NGDPDPC_Dis', 'weight': 'POP'})
 
 # DataFrame Between-Country
 # =====================================================================
@@ -91,17 +51,12 @@ dfb = df.copy()
 dfb = dfb[dfb['Year'] == 2024]
 dfb = dfb.sort_values(by=['Year', 'NGDPDPC_Dis'])
 
-# Calculating cummulative population and distribution
-dfb['GDP_Cum'] = dfb.groupby('Year')['NGDPDPC_Dis'].cumsum() / dfb.groupby('Year')['NGDPDPC_Dis'].transform('sum')
-dfb['POP'] = range(1, len(dfb) + 1)
-dfb['POP_Cum'] = dfb['POP'] / len(dfb)
+# Calculating cummulative population, distribution and Gini
+dfb['POP_Cum'], dfb['GDP_Cum'], dfb['Gini'] = lorenz(dfb['NGDPDPC_Dis'], dfb['POP'])
 
 # World Mean and Median
-dfb['Mean']  = dfb['NGDPDPC_Dis'].mean()
-dfb['Median']  = dfb['NGDPDPC_Dis'].median()
-
-# Calculation Gini
-dfb['Gini'] = dfb.groupby('Year')['NGDPDPC_Dis'].transform(lambda x: gini(x))
+dfb['Mean'] = np.average(dfb['NGDPDPC_Dis'], weights=dfb['POP'])
+dfb['Median'] = dfb.loc[dfb['POP_Cum'] >= 0.5, 'NGDPDPC_Dis'].iloc[0]
 
 # Selecting columns and filtering year
 dfb = dfb[['ISO3', 'Country', 'Year', 'Gini', 'GDP_Cum', 'POP_Cum', 'NGDPDPC_Dis', 'Mean', 'Median']]
@@ -115,17 +70,12 @@ dfb2 = df.copy()
 dfb2 = dfb2[dfb2['Year'] == 2000]
 dfb2 = dfb2.sort_values(by=['Year', 'NGDPDPC_Dis'])
 
-# Calculating cummulative population and distribution
-dfb2['GDP_Cum'] = dfb2.groupby('Year')['NGDPDPC_Dis'].cumsum() / dfb2.groupby('Year')['NGDPDPC_Dis'].transform('sum')
-dfb2['POP'] = range(1, len(dfb2) + 1)
-dfb2['POP_Cum'] = dfb2['POP'] / len(dfb2)
+# Calculating cummulative population, distribution and Gini
+dfb2['POP_Cum'], dfb2['GDP_Cum'], dfb2['Gini'] = lorenz(dfb2['NGDPDPC_Dis'], dfb2['POP'])
 
 # World Mean and Median
-dfb2['Mean']  = dfb2['NGDPDPC_Dis'].mean()
-dfb2['Median']  = dfb2['NGDPDPC_Dis'].median()
-
-# Calculation Gini
-dfb2['Gini'] = dfb2.groupby('Year')['NGDPDPC_Dis'].transform(lambda x: gini(x))
+dfb2['Mean'] = np.average(dfb2['NGDPDPC_Dis'], weights=dfb2['POP'])
+dfb2['Median'] = dfb2.loc[dfb2['POP_Cum'] >= 0.5, 'NGDPDPC_Dis'].iloc[0]
 
 # Selecting columns and filtering year
 dfb2 = dfb2[['ISO3', 'Country', 'Year', 'Gini', 'GDP_Cum', 'POP_Cum', 'NGDPDPC_Dis', 'Mean', 'Median']]
@@ -138,15 +88,9 @@ dfw = df.copy()
 # Sorting and formatting
 dfw = dfw[(dfw['ISO3'] == 'USA') & (dfw['Year'] == 2024)]
 dfw = dfw.sort_values(by=['Year', 'NGDPDPC_Dis'])
-dfw['LP'] = pd.to_numeric(dfw['LP'], errors='coerce')
-
-# Calculating cummulative population and distribution
-dfw['GDP_Cum'] = dfw.groupby('Year')['NGDPDPC_Dis'].cumsum() / dfw.groupby('Year')['NGDPDPC_Dis'].transform('sum')
-dfw['POP'] = range(1, len(dfw) + 1)
-dfw['POP_Cum'] = dfw['POP'] / len(dfw)
 
-# Calculation Gini
-dfw['Gini'] = dfw.groupby('Year')['NGDPDPC_Dis'].transform(lambda x: gini(x))
+# Calculating cummulative population, distribution and Gini
+dfw['POP_Cum'], dfw['GDP_Cum'], dfw['Gini'] = lorenz(dfw['NGDPDPC_Dis'], dfw['POP'])
 
 # Selecting columns and filtering year
 dfw = dfw[['ISO3', 'Country', 'Year', 'Gini', 'GDP_Cum', 'POP_Cum']]
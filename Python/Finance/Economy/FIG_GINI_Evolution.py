@@ -1,27 +1,27 @@
 # Libraries
 # =====================================================================
-import requests
 import wbgapi as wb
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.interpolate import make_interp_spline
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.imf import fetch_imf
+from utils.inequality import spread_distribution, gini
 
 # Data Extraction - GITHUB (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction - WBD (1960-2024)
 # ========================================================
 # To use the built-in plotting method
 indicator = ['NY.GDP.PCAP.CD', 'SP.POP.TOTL']
-countries = df_countries['ISO3'].tolist()
+countries = df_countries.index.tolist()
 data_range = range(1960, 2024)
 data = wb.data.DataFrame(indicator, countries, data_range, numericTimeKeys=True, labels=False, columns='series').reset_index()
 df_wb = data.rename(columns={
@@ -40,32 +40,8 @@ df_wb = df_wb[df_wb['Year'] < 2024]
 #Parametro
 parameters = ['NGDPDPC', 'LP']
 
-# Create an empty list
-records = []
-
-# Iterar sobre cada parámetro
-for parameter in parameters:
-    # Request URL
-    url = f"https://www.imf.org/external/datamapper/api/v1/{parameter}"
-    response = requests.get(url)
-    data = response.json()
-    values = data.get('values', {})
-
-    # Iterate over each country and year
-    for country, years in values.get(parameter, {}).items():
-        for year, value in years.items():
-            records.append({
-                'Parameter': parameter,
-                'ISO3': country,
-                'Year': int(year),
-                'Value': float(value)
-            })
-    
-# Create dataframe
-df_imf = pd.DataFrame(records)
-
-# Pivot Parameter to columns and filter nulls
-df_imf = df_imf.pivot(index=['ISO3', 'Year'], columns='Parameter', values='Value').reset_index()
+# Download parameters concurrently as a wide (ISO3, Year) dataframe
+df_imf = fetch_imf(parameters)
 
 # Filter after 2024
 df_imf = df_imf[df_imf['Year'] >= 2024]
@@ -77,33 +53,15 @@ df = pd.concat([df_wb, df_imf], ignore_index=True)
 df = df.dropna(subset=['NGDPDPC', 'LP'], how='any')
 
 # Merge and filter dataframes
-df = df.merge(df_countries, how='left', left_on='ISO3', right_on='ISO3')
+df = df.join(df_countries, on='ISO3')
 df = df[df['Region'].notna()]
 df = df[['ISO3', 'Year', 'NGDPDPC', 'LP']]
 
-# Expand rows with population
-columns = df.columns
-df = np.repeat(df.values, df['LP'].astype(int), axis=0)
-df = pd.DataFrame(df, columns=columns)
-
-# Function to create a new distribution
-def distribution(df):
-    average = df['NGDPDPC'].mean()
-    inequality = np.geomspace(1, 10, len(df))
-    df['NGDPDPC_Dis'] = inequality * (average / np.mean(inequality))
-    return df
-
-df = df.groupby(['ISO3', 'Year']).apply(distribution).reset_index(drop=True)
-
-# Function to calculate Global GINI
-def gini(x):
-    x = np.array(x)
-    x = np.sort(x)
-    n = len(x)
-    gini_index = (2 * np.sum(np.arange(1, n + 1) * x) - (n + 1) * np.sum(x)) / (n * np.sum(x))
-    return gini_index
-
-df['Gini'] = df.groupby('Year')['NGDPDPC_Dis'].transform(lambda x: gini(x))
+# Spread each country into a geomspace(1, 10) distribution, weighted by population
+df = spread_distribution(df, mean='NGDPDPC', population='LP')
+
+# Global Gini by year in one grouped pass
+df['Gini'] = gini(df['value'], groups=df['Year'], weights=df['weight'])
 
 # Select columns, remove duplicates and order by
 df = df[['Year', 'Gini']]
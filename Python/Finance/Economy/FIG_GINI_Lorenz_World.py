@@ -1,12 +1,15 @@
 # Libraries
 # ===================================================
-import requests
-import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.lines as mlines
 import matplotlib.patheffects as patheffects
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.wid import read_dataset
 
 # Parameters
 # =====================================================================
@@ -16,43 +19,32 @@ year = 2021
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO2)
+df_countries = load_countries(index='ISO2')
 
 # Data Extraction (Percentages)
 # ===================================================
-# URL GitHub
-url = "https://raw.githubusercontent.com/guillemmaya92/Python/main/Data/WID_Percentiles.parquet"
+# URL GitHub (parquet dataset partitioned by year)
+url = "https://raw.githubusercontent.com/guillemmaya92/Analytics/master/Data/WID_Percentiles"
 
-# Extract data from parquet
-df = pd.read_parquet(url, engine='pyarrow')
-
-# Filter year
-df = df[df['year'] == year]
+# Extract only the partition of the selected year
+df = read_dataset(url, years=[year])
 
 # Data Extraction (Values)
 # ===================================================
-# URL GitHub
-url = "https://raw.githubusercontent.com/guillemmaya92/Python/main/Data/WID_Values.parquet"
-
-# Extract data from parquet
-dfv = pd.read_parquet(url, engine='pyarrow')
+# URL GitHub (parquet dataset partitioned by year)
+url = "https://raw.githubusercontent.com/guillemmaya92/Analytics/master/Data/WID_Values"
 
-# Filter year
-dfv = dfv[dfv['year'] == year]
+# Extract only the partition of the selected year and the columns used
+dfv = read_dataset(url, years=[year], columns=['gincome', 'gwealth', 'population'])
 
 # Extract world values
 gincomew = dfv.loc[dfv['country'] == 'WO', 'gincome'].iloc[0]
 gwealthw = dfv.loc[dfv['country'] == 'WO', 'gwealth'].iloc[0]
 
 # Extract countries weighted average values
-dfincome = dfv[dfv['country'].isin(df_countries['ISO2']) & dfv['gincome'].notnull() & dfv['population'].notnull()]
-dfwealth = dfv[dfv['country'].isin(df_countries['ISO2']) & dfv['gwealth'].notnull() & dfv['population'].notnull()]
+dfincome = dfv[dfv['country'].isin(df_countries.index) & dfv['gincome'].notnull() & dfv['population'].notnull()]
+dfwealth = dfv[dfv['country'].isin(df_countries.index) & dfv['gwealth'].notnull() & dfv['population'].notnull()]
 
 gincomec = np.average(dfincome['gincome'], weights= dfincome['population'])
 gwealthc = np.average(dfwealth['gwealth'], weights= dfwealth['population'])
@@ -67,12 +59,12 @@ ginic= round(gwealthc, 2) if selection == 'Wealth' else round(gincomec, 2)
 df['percentile'] =  df['percentile'] / 100
 df['income'] =  df['income'] / 100
 df['wealth'] =  df['wealth'] / 100
-df['income_cum'] =  df.groupby(['country'])['income'].cumsum() / df.groupby(['country'])['income'].transform('sum')
-df['wealth_cum'] =  df.groupby(['country'])['wealth'].cumsum() / df.groupby(['country'])['wealth'].transform('sum')
+df['income_cum'] =  df.groupby(['country'], observed=True)['income'].cumsum() / df.groupby(['country'], observed=True)['income'].transform('sum')
+df['wealth_cum'] =  df.groupby(['country'], observed=True)['wealth'].cumsum() / df.groupby(['country'], observed=True)['wealth'].transform('sum')
 df['value_cum'] = df['income_cum'] if selection == 'Income' else df['wealth_cum']
 
 # Countries
-dfc = df.merge(df_countries, how='left', left_on='country', right_on='ISO2')
+dfc = df.join(df_countries, on='country')
 dfc = dfc[dfc['Region'].notna()]
 dfc = dfc[['country', 'percentile', 'value_cum']]
 
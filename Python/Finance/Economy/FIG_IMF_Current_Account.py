@@ -1,60 +1,37 @@
 # Libraries
 # =====================================================================
-import requests
-import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import matplotlib.ticker as mticker
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.imf import fetch_imf
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction (IMF)
 # =====================================================================
 #Parametro
 parameters = ['BCA']
 
-# Create an empty list
-records = []
-
-# Iterar sobre cada parámetro
-for parameter in parameters:
-    # Request URL
-    url = f"https://www.imf.org/external/datamapper/api/v1/{parameter}"
-    response = requests.get(url)
-    data = response.json()
-    values = data.get('values', {})
-
-    # Iterate over each country and year
-    for country, years in values.get(parameter, {}).items():
-        for year, value in years.items():
-            records.append({
-                'Parameter': parameter,
-                'ISO3': country,
-                'Year': int(year),
-                'Value': float(value)
-            })
-    
-# Create dataframe
-df_imf = pd.DataFrame(records)
+# Download parameters concurrently as a wide (ISO3, Year) dataframe
+df_imf = fetch_imf(parameters)
 
 # Data Manipulation
 # =====================================================================
-# Pivot Parameter to columns and filter nulls
-df = df_imf.pivot(index=['ISO3', 'Year'], columns='Parameter', values='Value').reset_index()
+# Filter nulls
+df = df_imf.copy()
 df = df.dropna(subset=['BCA'], how='any')
 
 # Merge queries
-df = df.merge(df_countries, how='left', left_on='ISO3', right_on='ISO3')
+df = df.join(df_countries, on='ISO3')
 df = df[['ISO3', 'Country', 'Year', 'BCA', 'Analytical', 'Region', 'Cod_Currency']]
 df = df[df['Region'].notna()]
 
@@ -163,4 +140,4 @@ for spine in plt.gca().spines.values():
 # Save figure...
 plt.savefig(r'C:\Users\guillem.maya\Downloads\FIG_IMF_Current_Account.png', format='png', dpi=300)
 
-plt.show()
\ No newline at end of file
+plt.show()
\ No newline at end of file
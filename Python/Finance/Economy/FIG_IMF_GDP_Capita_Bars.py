@@ -1,60 +1,39 @@
 # Libraries
 # =====================================================================
-import requests
 import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import matplotlib.ticker as ticker
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.imf import fetch_imf
+from utils.inequality import gini, weighted_mean, weighted_quantile
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction (IMF)
 # =====================================================================
 #Parametro
 parameters = ['LP', 'PPPPC']
 
-# Create an empty list
-records = []
-
-# Iterar sobre cada parámetro
-for parameter in parameters:
-    # Request URL
-    url = f"https://www.imf.org/external/datamapper/api/v1/{parameter}"
-    response = requests.get(url)
-    data = response.json()
-    values = data.get('values', {})
-
-    # Iterate over each country and year
-    for country, years in values.get(parameter, {}).items():
-        for year, value in years.items():
-            records.append({
-                'Parameter': parameter,
-                'ISO3': country,
-                'Year': int(year),
-                'Value': float(value)
-            })
-    
-# Create dataframe
-df_imf = pd.DataFrame(records)
+# Download parameters concurrently as a wide (ISO3, Year) dataframe
+df_imf = fetch_imf(parameters)
 
 # Data Manipulation
 # =====================================================================
-# Pivot Parameter to columns and filter nulls
-df = df_imf.pivot(index=['ISO3', 'Year'], columns='Parameter', values='Value').reset_index()
+# Filter nulls
+df = df_imf.copy()
 df = df.dropna(subset=['LP', 'PPPPC'], how='any')
 
 # Merge queries
-df = df.merge(df_countries, how='left', left_on='ISO3', right_on='ISO3')
+df = df.join(df_countries, on='ISO3')
 df = df[['ISO3', 'Country', 'Year', 'LP', 'PPPPC', 'Analytical', 'Region']]
 df = df[df['Region'].notna()]
 
@@ -66,22 +45,15 @@ df['LPcum'] = df.groupby('Year')['LP'].cumsum()
 df['Left'] = df.groupby('Year')['LP'].cumsum() - df['LP']
 
 # Calculate GDP Average weighted by Population and partitioned by Year
-df['AVG_Weight'] = df.groupby('Year')['PPPPC'].transform(lambda x: np.average(x, weights=df.loc[x.index, 'LP']))
+df['AVG_Weight'] = weighted_mean(df['PPPPC'], df['LP'], df['Year'])
 
 # Add a total GDP column and cummulative it
 df['GDP'] = df['PPPPC'] * df['LP']
 df['GDPcum'] = df.groupby('Year')['GDP'].cumsum()
 df['PPPPC_Change'] = ((df['PPPPC'] / df.groupby('ISO3')['PPPPC'].transform('first')) - 1) * 100
 
-# Define function to calculate Gini coefficient
-def gini(x):
-    x = np.array(x)
-    x = np.sort(x)
-    n = len(x)
-    gini_index = (2 * np.sum(np.arange(1, n + 1) * x) - (n + 1) * np.sum(x)) / (n * np.sum(x))
-    return gini_index
-
-df['Gini'] = df.groupby('Year')['PPPPC'].transform(lambda x: gini(x))
+# Calculate Gini coefficient by Year
+df['Gini'] = gini(df['PPPPC'], groups=df['Year'])
 
 # Define function to calculate a variation coefFicient
 def variation(x):
@@ -93,17 +65,9 @@ def variation(x):
 
 df['Variation'] = df.groupby('Year')['PPPPC'].transform(lambda x: variation(x))
 
-# Copy a df sample to calculate a median
-df_sample = df.copy()
-columns = df.columns
-df_sample = np.repeat(df_sample.values, df_sample['LP'].astype(int) * 10, axis=0)
-df_sample = pd.DataFrame(df_sample, columns=columns)
-df_sample = df_sample.groupby('Year')['PPPPC'].median().reset_index()
-df_sample = df_sample.rename(columns={'PPPPC': 'Median'})
-df_sample['Median_Change'] =  ((df_sample['Median'] /  df_sample['Median'].iloc[0]) -1) * 100
-
-# Merge queries
-df = df.merge(df_sample, how='left', on='Year')
+# Median weighted by population (each country counts LP x 10 times)
+df['Median'] = weighted_quantile(df['PPPPC'], df['LP'].astype(int) * 10, 0.5, df['Year'])
+df['Median_Change'] = ((df['Median'] / df.loc[df['Year'] == df['Year'].min(), 'Median'].iloc[0]) - 1) * 100
 
 # Data Visualization
 # =====================================================================
@@ -1,6 +1,5 @@
 # Libraries
 # =====================================================================
-import requests
 import wbgapi as wb
 import pandas as pd
 import numpy as np
@@ -8,22 +7,24 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import matplotlib.ticker as ticker
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.series import interpolate_panel
+from utils.imf import fetch_imf
+from utils.inequality import weighted_mean
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction - WBD (1960-1980)
 # ========================================================
 # To use the built-in plotting method
 indicator = ['NY.GDP.PCAP.CD', 'SP.POP.TOTL']
-countries = df_countries['ISO3'].tolist()
+countries = df_countries.index.tolist()
 data_range = range(1960, 2024)
 data = wb.data.DataFrame(indicator, countries, data_range, numericTimeKeys=True, labels=False, columns='series').reset_index()
 df_wb = data.rename(columns={
@@ -42,32 +43,8 @@ df_wb = df_wb[df_wb['Year'] < 1980]
 #Parametro
 parameters = ['LP', 'NGDPDPC']
 
-# Create an empty list
-records = []
-
-# Iterar sobre cada parámetro
-for parameter in parameters:
-    # Request URL
-    url = f"https://www.imf.org/external/datamapper/api/v1/{parameter}"
-    response = requests.get(url)
-    data = response.json()
-    values = data.get('values', {})
-
-    # Iterate over each country and year
-    for country, years in values.get(parameter, {}).items():
-        for year, value in years.items():
-            records.append({
-                'Parameter': parameter,
-                'ISO3': country,
-                'Year': int(year),
-                'Value': float(value)
-            })
-    
-# Create dataframe
-df_imf = pd.DataFrame(records)
-
-# Pivot Parameter to columns and filter nulls
-df_imf = df_imf.pivot(index=['ISO3', 'Year'], columns='Parameter', values='Value').reset_index()
+# Download parameters concurrently as a wide (ISO3, Year) dataframe
+df_imf = fetch_imf(parameters)
 
 # Filter after 2024
 df_imf = df_imf[df_imf['Year'] >= 1980]
@@ -79,25 +56,12 @@ df = pd.concat([df_wb, df_imf], ignore_index=True)
 df = df.dropna(subset=['NGDPDPC', 'LP'], how='any')
 
 # Merge queries
-df = df.merge(df_countries, how='left', left_on='ISO3', right_on='ISO3')
+df = df.join(df_countries, on='ISO3')
 df = df[['ISO3', 'Country', 'Year', 'LP', 'NGDPDPC', 'Analytical', 'Region']]
 df = df[df['Region'].notna()]
 
-# Create a list
-dfs = []
-
-# Interpolate monthly data
-for iso3 in df['ISO3'].unique():
-    temp_df = df[df['ISO3'] == iso3].copy()
-    temp_df['Date'] = pd.to_datetime(temp_df['Year'], format='%Y')
-    temp_df = temp_df[['Date', 'LP', 'NGDPDPC']]
-    temp_df = temp_df.set_index('Date').resample('ME').mean().interpolate(method='linear').reset_index()
-    temp_df['ISO3'] = iso3
-    temp_df['Year'] = temp_df['Date'].dt.year 
-    dfs.append(temp_df)
-    
-# Concat dataframes    
-df = pd.concat(dfs, ignore_index=True)
+# Interpolate monthly data of every country at once
+df = interpolate_panel(df, 'ISO3', 'Year', ['LP', 'NGDPDPC'])
 
 # Filter nulls and order
 df = df.sort_values(by=['Year', 'NGDPDPC'])
@@ -109,7 +73,7 @@ df['LP_Cum_Per'] = df['LP_Cum'] / df.groupby('Date')['LP_Cum'].transform('max')
 df['Left'] = df['LP_Cum_Per'] - df['LP_Per']
 
 # Calculate GDP Average weighted by Population and partitioned by Year
-df['AVG_Weight'] = df.groupby('Date')['NGDPDPC'].transform(lambda x: np.average(x, weights=df.loc[x.index, 'LP']))
+df['AVG_Weight'] = weighted_mean(df['NGDPDPC'], df['LP'], df['Date'])
 
 # Add a total GDP column and cummulative it
 df['GDP'] = df['NGDPDPC'] * df['LP']
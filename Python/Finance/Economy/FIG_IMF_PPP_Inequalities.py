@@ -1,56 +1,31 @@
 # Libraries
 # =====================================================================
-import requests
 import wbgapi as wb
-import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import matplotlib.ticker as ticker
 from matplotlib.lines import Line2D
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.imf import fetch_imf
+from utils.inequality import weighted_mean
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction - IMF (1980-2030)
 # =====================================================================
 #Parametro
 parameters = ['NGDPD', 'PPPGDP', 'LP']
 
-# Create an empty list
-records = []
-
-# Iterar sobre cada parámetro
-for parameter in parameters:
-    # Request URL
-    url = f"https://www.imf.org/external/datamapper/api/v1/{parameter}"
-    response = requests.get(url)
-    data = response.json()
-    values = data.get('values', {})
-
-    # Iterate over each country and year
-    for country, years in values.get(parameter, {}).items():
-        for year, value in years.items():
-            records.append({
-                'Parameter': parameter,
-                'ISO3': country,
-                'Year': int(year),
-                'Value': float(value)
-            })
-    
-# Create dataframe
-df_imf = pd.DataFrame(records)
-
-# Pivot Parameter to columns and filter nulls
-df_imf = df_imf.pivot(index=['ISO3', 'Year'], columns='Parameter', values='Value').reset_index()
+# Download parameters concurrently as a wide (ISO3, Year) dataframe
+df_imf = fetch_imf(parameters)
 
 # Filter after 2024
 df_imf = df_imf[df_imf['Year'] == 2024]
@@ -61,7 +36,7 @@ df_imf = df_imf[df_imf['Year'] == 2024]
 df = df_imf.dropna(subset=['NGDPD', 'PPPGDP', 'LP'], how='any')
 
 # Merge queries
-df = df.merge(df_countries, how='left', left_on='ISO3', right_on='ISO3')
+df = df.join(df_countries, on='ISO3')
 df = df[['Region', 'ISO3', 'Country', 'Cod_Currency', 'Year', 'NGDPD', 'PPPGDP', 'LP']]
 df = df[df['Cod_Currency'].notna()]
 
@@ -73,7 +48,7 @@ df['NGDPDPC'] = df['NGDPD'] / df['LP']
 df['PPPPC'] = df['PPPGDP'] / df['LP']
 
 # Calculate Average Weight and Percent
-df['AVG_Weight'] = df.groupby('Year')['NGDPDPC'].transform(lambda x: np.average(x, weights=df.loc[x.index, 'LP']))
+df['AVG_Weight'] = weighted_mean(df['NGDPDPC'], df['LP'], df['Year'])
 df['Percent'] = df['NGDPD'] / df.groupby('Year')['NGDPD'].transform('sum')
 
 # Filtering
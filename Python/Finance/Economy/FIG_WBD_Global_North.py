@@ -1,27 +1,24 @@
 # Libraries
 # =====================================================================
-import requests
 import wbgapi as wb
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Data Extraction - WBD (1960-1980)
 # ========================================================
 # To use the built-in plotting method
 indicator = ['NY.GDP.PCAP.KD', 'SP.POP.TOTL']
-countries = df_countries['ISO3'].tolist()
+countries = df_countries.index.tolist()
 data_range = ['1960', '2023']
 data = wb.data.DataFrame(indicator, countries, data_range, numericTimeKeys=True, labels=False, columns='series').reset_index()
 df_wb = data.rename(columns={
@@ -38,7 +35,7 @@ df_wb['gdpt'] = df_wb['gdpc'] * df_wb['pop']
 # Data Manipulation
 # =====================================================================
 # Merge queries
-df = df_wb.merge(df_countries, how='left', left_on='ISO3', right_on='ISO3')
+df = df_wb.join(df_countries, on='ISO3')
 df = df[['Analytical2', 'year', 'pop', 'gdpt']]
 df = df.rename(columns={'Analytical2': 'group'})
 df = df[df['group'].notna()]
@@ -1,39 +1,36 @@
 # Libraries
 # ===================================================
-import requests
 import os
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.wid import read_dataset
 
 # Extract Data (Countries)
 # ===================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO2)
+df_countries = load_countries(index='ISO2')
 
 # Extract Data (WID)
 # ===================================================
-# URL del archivo Parquet en GitHub
-url = "https://raw.githubusercontent.com/guillemmaya92/Analytics/master/Data/WID_Values.parquet"
-df = pd.read_parquet(url, engine="pyarrow")
-df = df[df['year'].isin([1980, 2023])]
+# URL del dataset Parquet en GitHub (solo las particiones de 1980 y 2023)
+url = "https://raw.githubusercontent.com/guillemmaya92/Analytics/master/Data/WID_Values"
+df = read_dataset(url, years=[1980, 2023])
 
 # Transform Data
 # ===================================================
 df['tincome'] = df['tincome2'] / df['xusd'] / 1000
 df['twealth'] = df['twealth2'] / df['xusd'] / 1000
 df['gdptotal'] = df['gdptotal'] / df['xusd']
-df['tincomeVAR'] = (df['tincome'] / df.groupby('country')['tincome'].shift(1) -1) * 100
-df['twealthVAR'] = (df['twealth'] / df.groupby('country')['twealth'].shift(1) -1) * 100
-df['wiratioVAR'] = (df['wiratio'] - df.groupby('country')['wiratio'].shift(1))
+df['tincomeVAR'] = (df['tincome'] / df.groupby('country', observed=True)['tincome'].shift(1) -1) * 100
+df['twealthVAR'] = (df['twealth'] / df.groupby('country', observed=True)['twealth'].shift(1) -1) * 100
+df['wiratioVAR'] = (df['wiratio'] - df.groupby('country', observed=True)['wiratio'].shift(1))
 df = df[df['year'] == 2023]
 df = df[df['wiratio'].notna() & df['tincome'].notna()]
-df = pd.merge(df, df_countries, left_on='country', right_on='ISO2', how='inner')
+df = df.join(df_countries, on='country', how='inner')
 df = df[['year', 'country', 'Country_Abr', 'gdptotal', 'tincome', 'twealth', 'wiratio', 'tincomeVAR', 'twealthVAR', 'wiratioVAR']]
 df = df[(df['tincome'] >= 0) & (df['tincome'] <= 120000)]
 df = df.sort_values(by='gdptotal', ascending=True)
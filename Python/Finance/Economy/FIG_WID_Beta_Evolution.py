@@ -1,7 +1,6 @@
 # Libraries
 # ===================================================
 import requests
-import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
@@ -10,28 +9,28 @@ import matplotlib.patheffects as patheffects
 import matplotlib.font_manager as fm
 import matplotlib.image as mpimg
 from io import BytesIO
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.wid import read_dataset
 
 # Extract Data (Countries)
 # ===================================================
-# Extract JSON to dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO2)
+df_countries = load_countries(index='ISO2')
 
 # Extract Data (WID)
 # ===================================================
-# Extract PARQUET to dataframe
-url = "https://raw.githubusercontent.com/guillemmaya92/Analytics/master/Data/WID_Values.parquet"
-df = pd.read_parquet(url, engine="pyarrow")
+# Extract PARQUET dataset to dataframe
+url = "https://raw.githubusercontent.com/guillemmaya92/Analytics/master/Data/WID_Values"
+df = read_dataset(url)
 
 # Transform Data
 # ===================================================
 # Filter nulls and countries
 df = df[df['wiratio'].notna()]
-df = pd.merge(df, df_countries, left_on='country', right_on='ISO2', how='inner')
+df = df.join(df_countries, on='country', how='inner')
 
 # Rename columns
 df = df.rename(
@@ -3,46 +3,33 @@
 import os
 import pandas as pd
 import numpy as np
-import requests
 import plotly.graph_objects as go
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.wid import read_wid
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df = df.rename(columns={'index': 'ISO3'})
-df = df[['ISO2', 'Country']]
-df_countries = df.rename(columns={'ISO2': 'country', 'Country': 'country_name'})
+# Country dimension (cached on disk, indexed by ISO2)
+df_countries = load_countries(index='ISO2')[['Country']].rename(columns={'Country': 'country_name'})
 
 # Data Extraction
 # ===================================================
 # Define CSV path
 path = r'C:\Users\guillem.maya\Downloads\data\X'
 
-# List to save dataframe
-list = []
-
-# Iterate over each file
-for archivo in os.listdir(path):
-    if archivo.startswith("WID_data_") and archivo.endswith(".csv"):
-        df = pd.read_csv(os.path.join(path, archivo), delimiter=';')
-        list.append(df)
-
-# Combine all dataframes and create a copy
-df = pd.concat(list, ignore_index=True)
-dfr = df.copy()
-dfp = df.copy()
-
 # Filter dataframes
 variable = ['anninci992', 'anweali992']
 variabler = ['xlceuxi999']
 variablep = ['npopuli999']
 percentile = ['p0p100']
 year = [1995, 2022]
+
+# Read only the rows of the three filters, files in parallel
+df = read_wid(path, variables=variable + variabler + variablep, percentiles=percentile, years=year + [max(year) + 1])
+dfr = df.copy()
+dfp = df.copy()
 df = df[df['variable'].isin(variable) & df['percentile'].isin(percentile) & df['year'].isin(year)]
 dfr = dfr[dfr['variable'].isin(variabler) & dfr['percentile'].isin(percentile) & dfr['year'].isin([max(year)+1])]
 dfp = dfp[dfp['variable'].isin(variablep) & dfp['percentile'].isin(percentile) & dfp['year'].isin([max(year)])]
@@ -51,7 +38,7 @@ dfp = dfp[dfp['variable'].isin(variablep) & dfp['percentile'].isin(percentile) &
 # ===================================================
 # Selection Columns DF
 df = df[['country', 'variable', 'year', 'value']]
-df['variable'] = df['variable'].replace({'anninci992': 'income', 'anweali992': 'wealth'})
+df['variable'] = df['variable'].cat.rename_categories({'anninci992': 'income', 'anweali992': 'wealth'})
 
 # Selection Columns DFR
 dfr = dfr[['country', 'value']]
@@ -66,7 +53,7 @@ df = pd.merge(df, dfr, on=['country'], how='left')
 df['value_eur'] = df['value'] / df['exchange']
 
 # Join Countries
-df = pd.merge(df, df_countries, on=['country'], how='left')
+df = df.join(df_countries, on='country')
 df = df[df['country_name'].notna()]
 
 # Replace year values
@@ -75,7 +62,7 @@ df['year'] = df['year'].apply(lambda x: 'CY' if x == max_value else 'PY')
 df['variable_year'] = df['variable'].astype(str) + df['year'].astype(str)
 
 # Pivot variable
-df = df.pivot_table(index=['country', 'country_name'], columns='variable_year', values='value_eur')
+df = df.pivot_table(index=['country', 'country_name'], columns='variable_year', values='value_eur', observed=True)
 df = df.reset_index()
 df = df[df['incomeCY'].notna() & df['wealthCY'].notna()]
 df = df[~df['country'].isin(['SL', 'CU', 'LU'])]
@@ -2,31 +2,29 @@
 # ==========================================
 import pandas as pd
 import numpy as np
-import requests
 import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.wid import read_dataset
 
 # Data Extraction - GITHUB (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3', 'Country_Abr': 'name'})
+# Country dimension (cached on disk, indexed by ISO2)
+df_countries = load_countries(index='ISO2').rename(columns={'Country_Abr': 'name'})
 
 # Data Extraction - WID (Percentiles)
 # ==========================================
-# Carga del archivo Parquet
-df = pd.read_parquet("https://github.com/guillemmaya92/Analytics/raw/refs/heads/master/Data/WID_Percentiles.parquet")
+# Carga del dataset Parquet (solo la partición de 2021 y los países seleccionados)
+countries = ["NO", "DK", "ES", "FR", "DE", "UK", "US", "IN", "CN", "JA", "AR", "RU", "QA", "CL", "BR", "CA", "AU", "KR", "MX", "ZA"]
+df = read_dataset("https://raw.githubusercontent.com/guillemmaya92/Analytics/master/Data/WID_Percentiles", years=[2021], countries=countries)
 
 # Data Manipulation
 # =====================================================================
-# Filter a year and select measure
-df = df[df['country'].isin(["NO", "DK", "ES", "FR", "DE", "UK", "US", "IN", "CN", "JA", "AR", "RU", "QA", "CL", "BR", "CA", "AU", "KR", "MX", "ZA"])]
-df = df[df['year'] == 2021]
+# Select measure
 df['value'] = df['wealth']
 
 # Grouping by percentiles
@@ -50,8 +48,7 @@ df['value'] = np.where((df['group'] == 'bottom50') & (df['value'] >= 0), np.nan,
 df_pivot = df.pivot(index="country", columns="group", values="value").fillna(0).reset_index()
 
 # Merge names
-df_pivot = df_pivot.merge(df_countries[['ISO2', 'name']], left_on='country', right_on='ISO2', how='inner')
-df_pivot = df_pivot.drop(columns=['ISO2'])
+df_pivot = df_pivot.join(df_countries['name'], on='country', how='inner')
 
 # Define column with values for individuals and professionals
 df_pivot['total_left'] = df_pivot['bottom50'] + df_pivot['50-90']
@@ -1,48 +1,38 @@
 # Libraries
 # ===================================================
-import requests
 import os
-import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 from matplotlib.ticker import FuncFormatter
 import matplotlib.patches as patches
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.countries import load_countries
+from utils.wid import read_wid, parse_percentiles
 
 # Data Extraction (Countries)
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-df = pd.DataFrame(data)
-df = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = df.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO2)
+df_countries = load_countries(index='ISO2')
 
 # Data Extraction
 # ===================================================
 # Define CSV path
 path = r'C:\Users\guill\Downloads\data\ALL'
 
-# List to save dataframe
-list = []
-
-# Iterate over each file
-for archivo in os.listdir(path):
-    if archivo.startswith("WID_data_") and archivo.endswith(".csv"):
-        df = pd.read_csv(os.path.join(path, archivo), delimiter=';')
-        list.append(df)
-
-# Combine all dataframe
-dfx = pd.concat(list, ignore_index=True)
-
-# Data Manipulation
-# ===================================================
 # Filter dataframe
 variable = ['sdiincj992', 'adiincj992']
 variable2 = ['gdiincj992']
 country = ['US', 'CL', 'NL', 'ZA', 'CN', 'IN', 'AU']
 year = [2022]
+
+# Read only the filtered rows, files in parallel
+dfx = read_wid(path, variables=variable + variable2, years=year)
+
+# Data Manipulation
+# ===================================================
+# Filter dataframe
 df = dfx[dfx['variable'].isin(variable) & dfx['year'].isin(year)]
 
 # DF Gini
@@ -50,25 +40,25 @@ dfg = dfx[dfx['variable'].isin(variable2) & dfx['year'].isin(year) & dfx['countr
 dfg = dfg[['country', 'value']]
 dfg = dfg[['country', 'value']].rename(columns={'value': 'gini'})
 
-# Clean dataframe
-df = df[~df['percentile'].str.contains(r'\.', na=False)]
-df['dif'] = df['percentile'].str.extract(r'p(\d+)p(\d+)').astype(int).apply(lambda x: x[1] - x[0], axis=1)
-df = df[df['dif'] == 1]
-df['percentile'] = df['percentile'].str.extract(r'p\d+p(\d+)').astype(int)
+# Clean dataframe: whole one-point percentiles, named by their upper bound
+bounds = parse_percentiles(df['percentile'])
+keep = ~bounds['fractional'] & (bounds['width'] == 1)
+df = df[keep]
+df['percentile'] = bounds.loc[keep, 'upper'].astype(int)
 df = df.sort_values(by='percentile')
 
 # Pivot dataframe
-df['variable'] = df['variable'].replace({'sdiincj992': 'percentage', 'adiincj992': 'value', 'gdiincj992': 'gini'})
+df['variable'] = df['variable'].cat.rename_categories({'sdiincj992': 'percentage', 'adiincj992': 'value', 'gdiincj992': 'gini'})
 df = df[['variable', 'country', 'percentile', 'value']]
-df = df.pivot_table(index=['country', 'percentile'], columns='variable', values='value')
+df = df.pivot_table(index=['country', 'percentile'], columns='variable', values='value', observed=True)
 df = df.reset_index()
 
 # Calculate cummulative
 df['percentile'] =  df['percentile'] / 100
-df['value'] =  df.groupby(['country'])['value'].cumsum() / df.groupby(['country'])['value'].transform('sum')
+df['value'] =  df.groupby(['country'], observed=True)['value'].cumsum() / df.groupby(['country'], observed=True)['value'].transform('sum')
 
 # Merge regions 
-df = df.merge(df_countries, how='left', left_on='country', right_on='ISO2')
+df = df.join(df_countries, on='country')
 df = df[['Region', 'Country_Abr','country', 'percentile', 'value']]
 df = df[df['Region'].notna()]
 
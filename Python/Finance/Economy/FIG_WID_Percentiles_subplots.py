@@ -1,35 +1,27 @@
 # Libraries
 # ===================================================
 import os
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import matplotlib.ticker as mtick
 from matplotlib.lines import Line2D
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.wid import read_wid
 
 # Data Extraction
 # ===================================================
 # Define CSV path
 path = r'C:\Users\guillem.maya\Downloads\data'
 
-# List to save dataframe
-list = []
-
-# Iterate over each file
-for archivo in os.listdir(path):
-    if archivo.startswith("WID_data_") and archivo.endswith(".csv"):
-        df = pd.read_csv(os.path.join(path, archivo), delimiter=';')
-        list.append(df)
-
-# Combine all dataframes and create a copy
-df = pd.concat(list, ignore_index=True)
-
 # Filter dataframes
 country = ['US', 'FR', 'ES', 'CN', 'WO']
 variable = ['sdiincj992', 'shwealj992']
 percentile = ['p0p50', 'p90p100']
 year = range(1980, 2022)
-df = df[(df['country'].isin(country)) & df['variable'].isin(variable) & df['percentile'].isin(percentile) & df['year'].isin(year)]
+
+# Read only the filtered rows, files in parallel
+df = read_wid(path, variables=variable, percentiles=percentile, years=year, countries=country)
 
 # Data Manipulation
 # ===================================================
@@ -39,10 +31,10 @@ df = df[~((df['country'] == 'WO') &
                    (df['year'] < 2002))]
 
 # Replace values
-df['size'] = df['percentile'].replace({'p0p50': '0.5', 'p90p100': '0.1'})
-df['percentile'] = df['percentile'].replace({'p0p50': 'Bottom 50', 'p90p100': 'Top 10'})
-df['variable'] = df['variable'].replace({'sdiincj992': 'Income', 'shwealj992': 'Wealth'})
-df['country'] = df['country'].replace({'CN': 'China', 'FR': 'France', 'US': 'USA', 'ES': 'Spain', 'WO': 'World'})
+df['size'] = df['percentile'].cat.rename_categories({'p0p50': '0.5', 'p90p100': '0.1'})
+df['percentile'] = df['percentile'].cat.rename_categories({'p0p50': 'Bottom 50', 'p90p100': 'Top 10'})
+df['variable'] = df['variable'].cat.rename_categories({'sdiincj992': 'Income', 'shwealj992': 'Wealth'})
+df['country'] = df['country'].cat.rename_categories({'CN': 'China', 'FR': 'France', 'US': 'USA', 'ES': 'Spain', 'WO': 'World'})
 
 # Concatenate country and variable
 df['variable_percentile'] = df['percentile'].astype(str) + ' (' + df['variable'].astype(str) + ')'
@@ -7,42 +7,35 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 from matplotlib.ticker import FuncFormatter
 import matplotlib.patches as patches
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.wid import read_wid, parse_percentiles
 
 # Data Extraction
 # ===================================================
 # Define CSV path
 path = r'C:\Users\guillem.maya\Downloads\data\Y'
 
-# List to save dataframe
-list = []
-
-# Iterate over each file
-for archivo in os.listdir(path):
-    if archivo.startswith("WID_data_") and archivo.endswith(".csv"):
-        df = pd.read_csv(os.path.join(path, archivo), delimiter=';')
-        list.append(df)
-
-# Combine all dataframe
-df = pd.concat(list, ignore_index=True)
-
-# Data Manipulation
-# ===================================================
 # Filter dataframe
 variable = ['shwealj992', 'ahwealj992']
 year = [2022]
-df = df[df['variable'].isin(variable) & df['year'].isin(year)]
 
-# Clean dataframe
-df = df[~df['percentile'].str.contains(r'\.', na=False)]
-df['dif'] = df['percentile'].str.extract(r'p(\d+)p(\d+)').astype(int).apply(lambda x: x[1] - x[0], axis=1)
-df = df[df['dif'] == 1]
-df['percentile'] = df['percentile'].str.extract(r'p\d+p(\d+)').astype(int)
+# Read only the filtered rows, files in parallel
+df = read_wid(path, variables=variable, years=year)
+
+# Data Manipulation
+# ===================================================
+# Clean dataframe: whole one-point percentiles, named by their upper bound
+bounds = parse_percentiles(df['percentile'])
+keep = ~bounds['fractional'] & (bounds['width'] == 1)
+df = df[keep]
+df['percentile'] = bounds.loc[keep, 'upper'].astype(int)
 df = df.sort_values(by='percentile')
 
 # Pivot dataframe
-df['variable'] = df['variable'].replace({'shwealj992': 'percentage', 'ahwealj992': 'value'})
+df['variable'] = df['variable'].cat.rename_categories({'shwealj992': 'percentage', 'ahwealj992': 'value'})
 df = df[['variable', 'year', 'country', 'percentile', 'value']]
-df = df.pivot_table(index=['year', 'country', 'percentile'], columns='variable', values='value')
+df = df.pivot_table(index=['year', 'country', 'percentile'], columns='variable', values='value', observed=True)
 df = df.reset_index()
 
 # Grouping by 10
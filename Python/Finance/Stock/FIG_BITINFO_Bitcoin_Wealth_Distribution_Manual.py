@@ -3,13 +3,16 @@
 import pandas as pd
 import numpy as np
 from bs4 import BeautifulSoup
-import requests
 from io import StringIO
 from scipy.interpolate import interp1d
 import seaborn as sns
 import matplotlib.pyplot as plt
 from matplotlib.ticker import FuncFormatter
 import matplotlib.patches as patches
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.inequality import bucket_distribution, bucket_percentiles, bucket_gini, weighted_bins
 
 # Manual Data
 # ===================================================
@@ -31,60 +34,23 @@ df['average'] = df['btc'] / df['rows']
 # Data Transformation
 # ===================================================
 
-# Create a list
-result = []
-
-# Iterate over each row 
-for index, row in df.iterrows():
-    n = int(row['rows'])
-    start = row['start']
-    end = row['end']
-    average = row['average']
-    
-    # Generate a distribution
-    valores = np.logspace(np.log(start) / np.log(12), np.log(end) / np.log(12), n)
-        
-   # Calcular el factor de escala para ajustar el promedio
-    current_average = np.mean(valores)
-    scale_factor = average / current_average
-    adjusted_values = valores * scale_factor
-
-    # Add values to result list
-    result.extend(valores)
-
-# Crear a dataframe with all values
-df = pd.DataFrame(result, columns=['btc'])
-
 # Calculate marketcap
 marketcap = df['btc'].sum() * btcprice
 
-# USD Value, Filter >5000 and count
-df['usd'] = df['btc'] * btcprice
-df = df[df['usd'] > 5000]
-df['count'] = 1
+# Log-uniform addresses in each bucket, rescaled to its BTC total, above 5000$
+pieces = bucket_distribution(df['start'], df['end'], df['rows'], df['btc'], minimum=5000 / btcprice)
 
-# Grouping by 100 percentiles
-df['percentile'] = pd.qcut(df['btc'], 100, labels=False) + 1
+# Grouping by 100 percentiles (computed from the bucket boundaries)
+df = bucket_percentiles(pieces, 100)
+df = df.rename(columns={'total': 'btc'})
+df['usd'] = df['btc'] * btcprice
 
-# Grouping by 10 percentiles
-df['percentile2'] = pd.cut(
-    df['percentile'], 
-    bins=range(1, 111, 10), 
-    right=False, 
-    labels=[i + 9 for i in range(1, 101, 10)]
-).astype(int)
+# Grouping by 10 percentiles: equal-count bins of the ranked percentiles
+membership, deciles = weighted_bins(df['usd'] / df['count'], df['count'], bins=10, ranked=True)
+df['percentile2'] = membership * 10
 
 # Calculate GINI Index
-def gini(x):
-    x = np.array(x)
-    x = np.sort(x)
-    n = len(x)
-    gini_index = (2 * np.sum(np.arange(1, n + 1) * x) - (n + 1) * np.sum(x)) / (n * np.sum(x))
-    return gini_index
-gini_value = gini(df['usd'])
-
-# Summarizing data 
-df = df.groupby(['percentile', 'percentile2'])[['usd', 'btc', 'count']].sum().reset_index()
+gini_value = bucket_gini(pieces)
 
 # Average price
 df['average_usd'] = df['usd'] / df['count']
@@ -111,9 +77,10 @@ color_palette = {
 df['color'] = df['percentile2'].map(color_palette)
 
 # Percentiles dataframe 2
-df2 = df.copy()
-df2 = df2.groupby(['percentile2', 'color'], as_index=False)[['usd', 'count']].sum()
-df2['average_usd'] = df2['usd'] / df2['count']
+df2 = deciles.rename(columns={'total': 'usd', 'weight': 'count', 'mean': 'average_usd'})
+df2['percentile2'] = df2['bin'] * 10
+df2['color'] = df2['percentile2'].map(color_palette)
+df2 = df2[['percentile2', 'color', 'usd', 'count', 'average_usd']]
 df2['percentage'] = df2['usd'] / (df2['usd']).sum()
 df2['count'] = 10
 
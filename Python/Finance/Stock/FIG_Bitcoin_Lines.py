@@ -4,38 +4,15 @@ import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
-import requests
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.cryptocompare import load_histoday
 
 # Get API Data
 # ==============================================================================
-# Create a df with final year dates
-dp = pd.DataFrame({'date': pd.date_range(start='2010-12-31', end='2024-12-31', freq='Y')})
-dp['to_ts'] = dp['date'].apply(lambda x: int(pd.to_datetime(x).timestamp()))
-
-# Create an empty list
-dataframes = []
-
-# Iterate API with each date
-for to_ts in dp['to_ts']:
-    # Build an URL with parameters and transform data
-    url = f"https://min-api.cryptocompare.com/data/v2/histoday?fsym=BTC&tsym=USD&limit=365&toTs={to_ts}"
-    response = requests.get(url)
-    data = response.json().get("Data", {}).get("Data", [])
-    df = pd.DataFrame([
-        {
-            "symbol": "BTCUSD",
-            "date": pd.to_datetime(entry["time"], unit="s").date(),
-            "open": entry["open"],
-            "close": entry["close"],
-            "low": entry["low"],
-            "high": entry["high"],
-            "volume": entry["volumeto"]
-        }
-        for entry in data
-    ])
-    dataframes.append(df)
-# Combine all df into one
-btc = pd.concat(dataframes, ignore_index=True)
+# Daily OHLCV from the local store (only missing days are requested)
+btc = load_histoday('BTC', 'USD')
 
 # DataSet 0 - Halving
 #================================================================================
@@ -49,7 +26,6 @@ halving['date'] = pd.to_datetime(halving['date'])
 # DataSet 1 - BTC Price
 # ==============================================================================
 # Definir y ordenar dataset
-btc = btc.drop_duplicates()
 btc['date'] = pd.to_datetime(btc['date'])
 btc['year_month'] = btc['date'].dt.strftime('%Y-%m')
 btc = btc.set_index('date')
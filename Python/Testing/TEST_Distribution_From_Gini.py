@@ -5,6 +5,10 @@ import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 from scipy.stats import lognorm, norm
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.inequality import gini
 
 # Input Data
 # =======================================================
@@ -13,26 +17,36 @@ countries = [
     {"country": "ESP", "income": 500, "gini": 0.8, "population": 1000000}
 ]
 
+# Simulation mode: 'analytic' (lognormal quantile grid) or 'sample' (random draws)
+mode = 'analytic'
+grid = 10000
+max_sample = 1000000
+
 # Functions
 # =======================================================
 # Function to calculate sigma from Gini
 def gini_to_sigma(gini):
     return np.sqrt(2) * norm.ppf((gini + 1) / 2)
 
-# Function to simulate distribution
-def simulate_income_distribution(income, gini, population):
+# Function to get lognormal parameters from mean income and Gini
+def lognormal_params(income, gini):
     sigma = gini_to_sigma(gini)
     mu = np.log(income) - (sigma**2) / 2
-    incomes = lognorm(s=sigma, scale=np.exp(mu)).rvs(size=population)
-    return incomes
-
-# Function to calculate Gini
-def gini(x):
-    x = np.array(x)
-    x = np.sort(x)
-    n = len(x)
-    gini_index = (2 * np.sum(np.arange(1, n + 1) * x) - (n + 1) * np.sum(x)) / (n * np.sum(x))
-    return gini_index
+    return mu, sigma
+
+# Function to get the distribution on a grid of quantiles (each point weights population / grid)
+def quantile_income_distribution(income, gini, population, grid=grid):
+    mu, sigma = lognormal_params(income, gini)
+    n = min(population, grid)
+    incomes = lognorm(s=sigma, scale=np.exp(mu)).ppf((np.arange(n) + 0.5) / n)
+    return incomes, np.full(n, population / n)
+
+# Function to simulate distribution (at most max_sample draws, each one weights population / draws)
+def simulate_income_distribution(income, gini, population, max_sample=max_sample):
+    mu, sigma = lognormal_params(income, gini)
+    n = min(population, max_sample)
+    incomes = lognorm(s=sigma, scale=np.exp(mu)).rvs(size=n)
+    return incomes, np.full(n, population / n)
 
 # Data Manipulation
 # =======================================================
@@ -40,29 +54,41 @@ def gini(x):
 data = []
 
 for country in countries:
-    incomes = simulate_income_distribution(country["income"], country["gini"], country["population"])
+    distribution = quantile_income_distribution if mode == 'analytic' else simulate_income_distribution
+    incomes, weights = distribution(country["income"], country["gini"], country["population"])
     df_country = pd.DataFrame({
         "Country": country["country"],
-        "Income": incomes
+        "Income": incomes,
+        "Weight": weights
     })
     data.append(df_country)
 
 # Concatenate Dataframes
 df = pd.concat(data, ignore_index=True)
 
+# Summary by country (points have equal weights within a country)
+grouped = df.groupby('Country')['Income']
+summary = pd.DataFrame({
+    'Population': df.groupby('Country')['Weight'].sum(),
+    'Average_Income': grouped.mean(),
+    'Median_Income': grouped.median(),
+    'Gini': gini(df['Income'], groups=df['Country']).groupby(df['Country']).first(),
+    'Quantile_01': grouped.quantile(0.01),
+    'Quantile_99': grouped.quantile(0.99)
+})
+
 # Sorting and adding columns
 df = df.sort_values(by="Income", ascending=True)
 df['Log_Income'] = np.log(df['Income'])
-df['Average_Income'] = df['Income'].mean()
-df['Median_Income'] = df['Income'].median()
-df['Gini'] = df['Income'].apply(lambda x: gini(df['Income']))
+df = df.join(summary[['Average_Income', 'Median_Income', 'Gini']], on='Country')
 
 # Calculate quantiles
-quantile_min = df['Income'].quantile(0.01)
-quantile_max = df['Income'].quantile(0.99)
+quantile_min = summary['Quantile_01'].min()
+quantile_max = summary['Quantile_99'].max()
 
 # Show Data
 print(df)
+print(summary)
 
 # Data Visualization
 # =======================================================
@@ -71,7 +97,7 @@ plt.rcParams.update({'font.family': 'sans-serif', 'font.sans-serif': ['Open Sans
 
 # Plot income distribution
 plt.figure(figsize=(10, 6))
-sns.histplot(df['Income'], color='lightblue', bins=500, kde=False)
+sns.histplot(df, x='Income', weights='Weight', hue='Country', color='lightblue', bins=500, kde=False)
 
 
 # Title and labels
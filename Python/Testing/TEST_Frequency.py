@@ -1,4 +1,8 @@
 import pandas as pd
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.series import densify, rolling_stats
 
 # Define dataframe
 df =  pd.DataFrame({
@@ -11,26 +15,11 @@ df =  pd.DataFrame({
 # Format Date
 df['Date'] = pd.to_datetime(df['Date'])
 
-# Create an empty dataframe
-result = pd.DataFrame()
-
-# Iterate each category
-for i in df['Category'].unique():
-    # Filter category, set index, fill empty, add category and concat with the emppty dataframe
-    category_df = df[df['Category'] == i]
-    category_df = category_df.set_index('Date')
-    category_df = category_df.asfreq('D').ffill()
-    category_df['Category'] = i
-    result = pd.concat([result, category_df])
-
-# Reset index
-df = result.reset_index()
-
-# Order by Category and Date
-df = result.sort_values(by=['Category', 'Date']).reset_index(drop=True)
+# Fill each category to daily frequency, ordered by Category and Date
+df = densify(df, 'Category', 'Date')
 
 # Calculate 30 days movng average partitioned by Category
-df['MA30'] = df.groupby('Category')['Close'].transform(lambda x: x.rolling(window=30, min_periods=1).mean())
+df['MA30'] = rolling_stats(df['Close'], [30], df['Category'])['ma30']
 
 # Get Last Value
 df['Prev_Close'] = df.groupby('Category')['Close'].shift(1)
@@ -2,6 +2,10 @@ import pyodbc
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.streaks import streak_probabilities
 
 # Conexión SQL Server
 # ==============================================================================
@@ -9,7 +13,7 @@ server = ''  # Nombre o dirección IP del servidor
 database = ''  # Nombre de la base de datos
 connection_string = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={server};DATABASE={database};Trusted_Connection=yes;'
 conn = pyodbc.connect(connection_string)
-query = "SELECT * FROM H_Currencies WHERE symbol = 'EURUSD'"
+query = "SELECT * FROM H_Currencies"
 df = pd.read_sql_query(query, conn)
 conn.close()
 
@@ -23,32 +27,31 @@ df['month'] = df['date'].dt.month
 df['month_name'] = df['date'].dt.month_name()
 df['day_of_week_num'] = df['date'].dt.dayofweek
 df['day_of_week_name'] = df['date'].dt.day_name()
-df = df.sort_values('date')
+df = df.sort_values(['symbol', 'date'])
 
 
 # Probability
 # ==============================================================================
 # Define parameters
+Symbol = 'EURUSD'
 Effect = 'Negative' #Positive/Negative
 ConsecutiveDays = 2
 Extra = 1
 
-# Calculate consecutive changes
-if Effect == 'Positive':
-    df['consecutive'] = (df['changepercent'] < 0).astype(int)
-else:
-    df['consecutive'] = (df['changepercent'] > 0).astype(int)
-df['consecutive'] = df['consecutive'].groupby((df['consecutive'] != df['consecutive'].shift()).cumsum()).cumsum()
+# Matrix sizes, at least as large as the requested streak
+max_days = max(10, ConsecutiveDays)
+max_extra = max(5, Extra)
 
-# Filter and count consecutive rows
-filterx = df[df['consecutive'] == ConsecutiveDays]
-countx = len(filterx)
+# Continuation matrix P(streak >= days + extra | streak >= days) of every symbol and direction
+matrix = streak_probabilities(df, 'changepercent', 'symbol', max_days=max_days, max_extra=max_extra)
 
-# Filter and count consecutive rows + n
-filtery = df[df['consecutive'] == ConsecutiveDays + Extra]
-county = len(filtery)
+# Breakdowns by the day of week and the month when the streak reaches its days
+matrix_weekday = streak_probabilities(df, 'changepercent', 'symbol', by='day_of_week_num', max_days=max_days, max_extra=max_extra)
+matrix_month = streak_probabilities(df, 'changepercent', 'symbol', by='month', max_days=max_days, max_extra=max_extra)
 
 # Calculate the probability
-probability = county / countx if county != 0 else 0
+direction = 'up' if Effect == 'Positive' else 'down'
+row = matrix[(matrix['symbol'] == Symbol) & (matrix['direction'] == direction) & (matrix['days'] == ConsecutiveDays) & (matrix['extra'] == Extra)]
+probability = row['probability'].fillna(0).iloc[0] if len(row) else 0
 
-print(f"The probability of going {'up' if Effect == 'Positive' else 'down'} {Extra} day more after {ConsecutiveDays} consecutive {'positive' if Effect == 'Positive' else 'negative'} days is: {probability}")
\ No newline at end of file
+print(f"The probability of going {direction} {Extra} day more after {ConsecutiveDays} consecutive {'positive' if Effect == 'Positive' else 'negative'} days is: {probability}")
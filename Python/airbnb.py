@@ -1,14 +1,16 @@
 # Libraries
 # ==========================================
 import pandas as pd
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.airbnb import load_listings
 
 # Data Extraction (insideairbnb)
 # ==========================================
 url1 = 'https://data.insideairbnb.com/spain/catalonia/girona/2024-09-29/visualisations/listings.csv'
 url2 = 'https://data.insideairbnb.com/spain/catalonia/barcelona/2024-09-06/visualisations/listings.csv'
-df1=pd.read_csv(url1)
-df2=pd.read_csv(url2)
-df = pd.concat([df1, df2], axis=0)
+df = load_listings([url1, url2])
 
 # Data Manipulation
 # ==========================================
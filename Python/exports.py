@@ -6,6 +6,10 @@ from io import BytesIO
 import wbgapi as wb
 import matplotlib.pyplot as plt
 import seaborn as sns
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.countries import load_countries
 
 # Extraction Data MACROHISTORY
 # ============================================
@@ -39,19 +43,14 @@ dfp = pd.read_stata(BytesIO(response.content))
 
 # Extraction Data COUNTRIES
 # =====================================================================
-# Extract JSON and bring data to a dataframe
-url = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
-response = requests.get(url)
-data = response.json()
-dfc = pd.DataFrame(data)
-dfc = pd.DataFrame.from_dict(data, orient='index').reset_index()
-df_countries = dfc.rename(columns={'index': 'ISO3'})
+# Country dimension (cached on disk, indexed by ISO3)
+df_countries = load_countries()
 
 # Extraction Data WORLDBANK
 # ========================================================
 # To use the built-in plotting method
 indicator = ['NY.GDP.MKTP.CD', 'NE.EXP.GNFS.CD', 'NE.IMP.GNFS.CD']
-countries = df_countries['ISO3'].tolist()
+countries = df_countries.index.tolist()
 data_range = range(1970, 2024)
 data = wb.data.DataFrame(indicator, 'WLD', data_range, numericTimeKeys=True, labels=False, columns='series').reset_index()
 dfw = data.rename(columns={
@@ -0,0 +1,4 @@
+# Shared helpers for the figure and data scripts
+# =====================================================================
+# Scripts add the parent folder to sys.path and import the modules
+# directly, e.g. `from utils.countries import load_countries`.
@@ -0,0 +1,105 @@
+# Libraries
+# =====================================================================
+import os
+import re
+import pickle
+import hashlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from utils.http import session, cached_get, cache_path, write_atomic
+
+# Configuration
+# =====================================================================
+INDEX = 'https://insideairbnb.com/get-the-data/'
+
+# Links to the listings files of every city snapshot
+LINK = r'href=["\']([^"\']+/listings\.csv)["\']'
+
+# Columns of listings.csv used by the figures and their types
+LISTINGS = {'id': np.int64, 'host_id': np.int64, 'host_name': str, 'license': str}
+
+# Parsed catalogues already loaded in this process, keyed by content hash
+_frames = {}
+
+# Catalogue
+# =====================================================================
+# Function to parse the index page into one row per listings URL: country, province, city and
+# snapshot date from .../country/province/city/YYYY-MM-DD/.../listings.csv; cities without
+# province (or country) take the upper level (or the city) in their place
+def parse_catalogue(content):
+    urls = pd.Series(sorted(set(re.findall(LINK, content.decode('utf-8', errors='replace')))), dtype=object)
+    parts = urls.str.strip('/').str.split('/')
+
+    # One split, then every level is picked from the lists
+    host = parts.str[2]
+    city, province, country = parts.str[-4], parts.str[-5], parts.str[-6]
+    short = province == host
+    country = country.mask(short, city).mask(country == host, province)
+    province = province.mask(short, city)
+
+    # Typed table
+    df = pd.DataFrame({
+        'country': country.str.title(),
+        'province': province.str.title(),
+        'city': city.str.title(),
+        'date': pd.to_datetime(parts.str[-3], format='%Y-%m-%d', errors='coerce'),
+        'url': urls
+    })
+    return df.astype({'country': 'category', 'province': 'category', 'city': 'category'})
+
+# Function to load the catalogue of listings, keeping the latest snapshot of every city (latest=True)
+def load_catalogue(latest=True, ttl=86400):
+    # Cached index page, parsed once per content version and kept on disk
+    content = cached_get(INDEX, ttl=ttl)
+    key = hashlib.sha256(content).hexdigest()
+    if key not in _frames:
+        path = cache_path('frames', f'airbnb-{key}.pkl')
+        try:
+            _frames[key] = pd.read_pickle(path)
+        except Exception:
+            _frames[key] = parse_catalogue(content)
+            write_atomic(path, pickle.dumps(_frames[key]))
+    df = _frames[key].copy()
+
+    # Latest snapshot per city (dates that failed to parse only when there is no other)
+    if latest:
+        df = df.sort_values('date', kind='stable', na_position='first').drop_duplicates(['country', 'province', 'city'], keep='last')
+        df = df.sort_values(['country', 'province', 'city']).reset_index(drop=True)
+    return df
+
+# Listings
+# =====================================================================
+# Function to download one listings file straight into the CSV parser, keeping only the used
+# columns; snapshots never change, so each one is kept on disk by URL
+def fetch_listings(url, s=None, timeout=120):
+    path = cache_path('airbnb', f'{hashlib.sha256(url.encode()).hexdigest()}.pkl')
+    if os.path.exists(path):
+        return pd.read_pickle(path)
+    with (s or session()).get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        df = pd.read_csv(response.raw, usecols=lambda c: c in LISTINGS, dtype=LISTINGS)
+
+    # Older snapshots may lack some column (e.g. license)
+    df = df.reindex(columns=list(LISTINGS))
+    write_atomic(path, pickle.dumps(df))
+    return df
+
+# Function to load the listings of several snapshots (a catalogue frame or a list of URLs)
+# concurrently, with the catalogue columns (country, province, city...) of each one
+def load_listings(catalogue, workers=8, timeout=120):
+    catalogue = pd.DataFrame({'url': list(catalogue)}) if not isinstance(catalogue, pd.DataFrame) else catalogue.reset_index(drop=True)
+    s = session(pool=workers)
+
+    # Only the pruned columns of the files in flight are held in memory
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(lambda url: fetch_listings(url, s, timeout), catalogue['url']))
+    if not parts:
+        return pd.DataFrame(columns=[*catalogue.columns.drop('url'), *LISTINGS])
+
+    # Catalogue columns repeated over the rows of every snapshot
+    sizes = [len(p) for p in parts]
+    keys = catalogue.drop(columns='url').iloc[np.repeat(np.arange(len(catalogue)), sizes)].reset_index(drop=True)
+    keys = keys.apply(lambda c: c.cat.remove_unused_categories() if isinstance(c.dtype, pd.CategoricalDtype) else c)
+    return pd.concat([keys, pd.concat(parts, ignore_index=True)], axis=1)
@@ -0,0 +1,47 @@
+# Libraries
+# =====================================================================
+import os
+import io
+import hashlib
+import requests
+import pandas as pd
+from utils.http import cached_get, cache_path
+
+# Configuration
+# =====================================================================
+URL = 'https://raw.githubusercontent.com/guillemmaya92/world_map/main/Dim_Country.json'
+BUNDLED = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Data', 'DIM_Country.json')
+
+# Parsed frames already loaded in this process, keyed by content hash
+_frames = {}
+
+# Function to parse Dim_Country.json into a frame indexed by ISO3
+def parse_countries(content):
+    df = pd.read_json(io.BytesIO(content), orient='index', dtype=False)
+    df.index.name = 'ISO3'
+    return df
+
+# Function to load the country dimension
+def load_countries(index='ISO3', ttl=86400):
+    # Cached download, falling back to the bundled copy when offline
+    try:
+        content = cached_get(URL, ttl=ttl)
+    except requests.RequestException:
+        with open(BUNDLED, 'rb') as f:
+            content = f.read()
+
+    # Parse once per content version and keep the frame on disk
+    key = hashlib.sha256(content).hexdigest()
+    if key not in _frames:
+        path = cache_path('frames', f'countries-{key}.pkl')
+        try:
+            _frames[key] = pd.read_pickle(path)
+        except Exception:
+            _frames[key] = parse_countries(content)
+            _frames[key].to_pickle(path)
+    df = _frames[key].copy()
+
+    # Index by ISO3 (default) or ISO2 so callers can use df.join(..., on=...)
+    if index != 'ISO3':
+        df = df.reset_index().set_index(index)
+    return df
@@ -0,0 +1,79 @@
+# Libraries
+# =====================================================================
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from utils.http import session, cache_path
+
+# Configuration
+# =====================================================================
+URL = 'https://min-api.cryptocompare.com/data/v2/histoday'
+DAY = 86400
+LIMIT = 365
+MAX_LIMIT = 2000
+COLUMNS = ['date', 'open', 'close', 'low', 'high', 'volume']
+
+# Function to get one histoday window ending at to_ts (limit + 1 days)
+def fetch_window(s, fsym, tsym, to_ts, limit=LIMIT, timeout=30):
+    params = {'fsym': fsym, 'tsym': tsym, 'limit': limit, 'toTs': to_ts}
+    response = s.get(URL, params=params, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+
+    # Rate limits and unknown pairs come as HTTP 200 with Response 'Error'
+    if data.get('Response') == 'Error':
+        raise ValueError(f"CryptoCompare {fsym}{tsym}: {data.get('Message')}")
+    data = data.get('Data', {}).get('Data', [])
+    n = len(data)
+    return pd.DataFrame({
+        'time': np.fromiter((e['time'] for e in data), dtype=np.int64, count=n),
+        'open': np.fromiter((e['open'] for e in data), dtype=np.float64, count=n),
+        'close': np.fromiter((e['close'] for e in data), dtype=np.float64, count=n),
+        'low': np.fromiter((e['low'] for e in data), dtype=np.float64, count=n),
+        'high': np.fromiter((e['high'] for e in data), dtype=np.float64, count=n),
+        'volume': np.fromiter((e['volumeto'] for e in data), dtype=np.float64, count=n)
+    })
+
+# Function to get contiguous, non-overlapping windows ending at each of `ends` in parallel
+def fetch_windows(s, fsym, tsym, ends, limit, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        windows = list(executor.map(lambda t: fetch_window(s, fsym, tsym, int(t), limit=limit), ends))
+    return pd.concat(windows, ignore_index=True)
+
+# Function to get daily OHLCV history, fetching only the days missing locally
+def load_histoday(fsym, tsym, start='2010-01-01', symbol=None, workers=8):
+    s = session(pool=workers)
+    path = cache_path('cryptocompare', f'{fsym}{tsym}.csv')
+    store = pd.read_csv(path, parse_dates=['date']) if os.path.exists(path) else None
+    now = int(time.time())
+    today = now - now % DAY
+    start_ts = int(pd.Timestamp(start).timestamp())
+
+    if store is None or store.empty:
+        # First backfill: contiguous, non-overlapping year windows in parallel
+        ends = np.arange(now, start_ts - DAY, -(LIMIT + 1) * DAY)
+        new = fetch_windows(s, fsym, tsym, ends, LIMIT, workers)
+        new = new[new['time'] >= start_ts]
+    else:
+        # Daily refresh: the days after the last stored one (one request, or windows of the
+        # API maximum after a long gap)
+        last = int(store['date'].iloc[-1].timestamp())
+        limit = min(max((today - last) // DAY, 1), MAX_LIMIT)
+        ends = np.arange(now, last, -(limit + 1) * DAY)
+        new = fetch_windows(s, fsym, tsym, ends, limit, workers)
+        new = new[new['time'] > last]
+    new = new.sort_values('time')
+
+    # Append closed days only; today's candle is still moving
+    new['date'] = pd.to_datetime(new['time'], unit='s')
+    closed = new[new['time'] < today][COLUMNS]
+    if len(closed):
+        closed.to_csv(path, mode='a', header=not os.path.exists(path), index=False, date_format='%Y-%m-%d')
+
+    # Stored history plus the live day
+    parts = [store, closed, new[new['time'] >= today][COLUMNS]]
+    df = pd.concat([p for p in parts if p is not None and len(p)] or [closed], ignore_index=True)
+    df.insert(0, 'symbol', symbol or f'{fsym}{tsym}')
+    return df
@@ -0,0 +1,85 @@
+# Libraries
+# =====================================================================
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.http import session, cache_path, write_atomic
+
+# Configuration
+# =====================================================================
+URL = 'http://api.exchangerate.host/timeframe'
+
+# Function to decode a {date: {symbol: rate}} mapping into columnar arrays
+def decode_quotes(quotes, symbols):
+    lookup = {s: i for i, s in enumerate(symbols)}
+    dates = [d for d, rates in quotes.items() if isinstance(rates, dict)]
+    sizes = np.fromiter((len(quotes[d]) for d in dates), dtype=np.int64, count=len(dates))
+    total = int(sizes.sum())
+    day = np.repeat(np.array(dates, dtype='datetime64[D]'), sizes)
+    code = np.fromiter((lookup.get(s, -1) for d in dates for s in quotes[d]), dtype=np.int16, count=total)
+    rate = np.fromiter((np.nan if r is None else r for d in dates for r in quotes[d].values()), dtype=np.float64, count=total)
+
+    # Drop symbols that are not in the requested list
+    keep = code >= 0
+    return pd.DataFrame({
+        'symbol': pd.Categorical.from_codes(code[keep], categories=symbols),
+        'date': day[keep].astype('datetime64[ns]'),
+        'rate': rate[keep]
+    })
+
+# Function to download one year window
+def fetch_year(s, year, apikey, currencies, source, symbols, timeout=120):
+    params = {
+        'access_key': apikey,
+        'start_date': f"{year}-01-01",
+        'end_date': f"{year}-12-31",
+        'source': source,
+        'currencies': ','.join(currencies)
+    }
+    response = s.get(URL, params=params, timeout=timeout)
+    response.raise_for_status()
+
+    # The body may carry text around the JSON object
+    json_text = re.search(r'\{.*\}', response.text, re.S).group(0)
+    data = json.loads(json_text)
+
+    # Quota and key errors come as HTTP 200 with success false: raise so the year is retried
+    if data.get('success') is False or 'quotes' not in data:
+        raise ValueError(f"exchangerate.host {year}: {data.get('error', 'no quotes')}")
+    return decode_quotes(data['quotes'], symbols)
+
+# Function to download several years concurrently, resuming from the checkpoint
+def load_timeframe(years, apikey, currencies, source='EUR', workers=4):
+    s = session(pool=workers)
+    symbols = sorted(f'{source}{c}' for c in currencies)
+    checkpoint = cache_path('exchangerate', f'{source}_checkpoint.json')
+    done = set()
+    if os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            done = set(json.load(f))
+
+    # Years already on disk are not requested again (the current year always is)
+    def path(year):
+        return cache_path('exchangerate', f'{source}_{year}.pkl')
+    current = date.today().year
+    todo = [y for y in years if y >= current or y not in done or not os.path.exists(path(y))]
+
+    # Each finished year goes to disk and the checkpoint right away,
+    # so only the windows in flight are held in memory
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch_year, s, y, apikey, currencies, source, symbols): y for y in todo}
+        for future in as_completed(futures):
+            year = futures[future]
+            future.result().to_pickle(path(year))
+            if year < current:
+                done.add(year)
+                write_atomic(checkpoint, json.dumps(sorted(done)).encode())
+
+    # Combine compact yearly frames
+    df = pd.concat([pd.read_pickle(path(y)) for y in years], ignore_index=True)
+    df['symbol'] = df['symbol'].astype(pd.CategoricalDtype(symbols)).cat.remove_unused_categories()
+    return df
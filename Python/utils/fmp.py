@@ -0,0 +1,114 @@
+# Libraries
+# =====================================================================
+import os
+import time
+import pickle
+import threading
+import requests
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.http import session, write_atomic
+
+# Configuration
+# =====================================================================
+URL = 'https://financialmodelingprep.com/api/v3/historical-price-full/{symbol}'
+
+# Requests per minute allowed by the FMP plan
+QUOTA = 300
+
+# Days kept per symbol for incremental runs (longest moving average) and their columns
+STATE_DAYS = 300
+STATE_COLUMNS = ['symbol', 'date', 'open', 'close', 'low', 'high', 'volume']
+
+# Rate Limiter
+# =====================================================================
+# Token bucket shared by all worker threads
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Block until one token is available
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+# Extraction
+# =====================================================================
+# Function to get the daily history of one symbol (None when there is no data); the session
+# already retries 429 and 5xx answers with backoff
+def fetch_historical(s, bucket, symbol, p_from, p_to, apikey, timeout=60):
+    params = {'from': p_from, 'to': p_to, 'apikey': apikey}
+    bucket.acquire()
+    response = s.get(URL.format(symbol=symbol), params=params, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+
+    # Check if there is data
+    if 'historical' not in data:
+        return None
+
+    # Navigate and convert to DataFrame
+    df = pd.DataFrame(data['historical'])
+    df['symbol'] = symbol
+    return df
+
+# Function to stream (symbol, dataframe) pairs as soon as each download finishes
+# (since: optional {symbol: first date} overriding p_from); a symbol that still fails after
+# the retries is skipped, so it keeps its state and is requested again on the next run
+def stream_historical(symbols, p_from, p_to, apikey, workers=8, quota=QUOTA, since=None):
+    s = session(pool=workers)
+    since = since or {}
+    bucket = TokenBucket(quota / 60, capacity=workers)
+    symbols = iter(symbols)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Keep at most two requests per worker in flight
+        pending = {}
+        for symbol in symbols:
+            pending[executor.submit(fetch_historical, s, bucket, symbol, since.get(symbol, p_from), p_to, apikey)] = symbol
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                symbol = pending.pop(future)
+                try:
+                    df = future.result()
+                except (requests.RequestException, ValueError) as error:
+                    print(f'{symbol}: {error}')
+                    df = None
+                if df is not None:
+                    yield symbol, df
+                nxt = next(symbols, None)
+                if nxt is not None:
+                    pending[executor.submit(fetch_historical, s, bucket, nxt, since.get(nxt, p_from), p_to, apikey)] = nxt
+
+# Incremental State
+# =====================================================================
+# Function to read the state of a daily pipeline: last days ('rows'), outlier-filter state
+# ('filter') and last downloaded date ('fetched') of each symbol
+def read_state(path):
+    if not os.path.exists(path):
+        return {'rows': pd.DataFrame(columns=STATE_COLUMNS), 'filter': {}, 'fetched': {}}
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+# Function to save the state with the new days of the refreshed symbols
+def write_state(path, state, parts, days=STATE_DAYS):
+    rows = [r[[c for c in STATE_COLUMNS if c in r.columns]] for r in [state['rows'], *parts] if len(r)]
+    if rows:
+        rows = pd.concat(rows, ignore_index=True)
+        rows = rows.drop_duplicates(['symbol', 'date'], keep='last').sort_values(['symbol', 'date'])
+        state = {**state, 'rows': rows.groupby('symbol', sort=False).tail(days).reset_index(drop=True)}
+    write_atomic(path, pickle.dumps(state))
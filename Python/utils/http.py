@@ -0,0 +1,110 @@
+# Libraries
+# =====================================================================
+import os
+import json
+import time
+import hashlib
+import tempfile
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Configuration
+# =====================================================================
+# Cache folder (override with the ANALYTICS_CACHE environment variable)
+CACHE_DIR = os.environ.get('ANALYTICS_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'analytics'))
+
+# Headers to simulate agent
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.5481.100 Safari/537.36"
+}
+
+# Session
+# =====================================================================
+# Function to create a pooled session with retries and backoff
+def session(pool=16, retries=3, backoff=0.5):
+    s = requests.Session()
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=['GET'])
+    adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool, max_retries=retry)
+    s.mount('https://', adapter)
+    s.mount('http://', adapter)
+    s.headers.update(HEADERS)
+    return s
+
+# Disk Cache
+# =====================================================================
+# Function to get a path inside the cache folder
+def cache_path(*parts):
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+# Function to write a file atomically (a unique temporary file per call, so threads writing
+# the same path never share one)
+def write_atomic(path, content):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=f'{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+# Function to get a URL through the content-addressed cache
+def cached_get(url, ttl=86400, s=None, timeout=30):
+    # Metadata is keyed by URL, bodies by the hash of their content
+    key = hashlib.sha256(url.encode()).hexdigest()
+    meta_path = cache_path('index', f'{key}.json')
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+    body_path = cache_path('objects', meta['sha256']) if meta else None
+    cached = body_path is not None and os.path.exists(body_path)
+
+    # Fresh copy on disk: no request at all
+    if cached and time.time() - meta['fetched'] < ttl:
+        with open(body_path, 'rb') as f:
+            return f.read()
+
+    # Revalidate with ETag / Last-Modified
+    headers = {}
+    if cached and meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if cached and meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    try:
+        response = (s or requests).get(url, headers=headers, timeout=timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.RequestException:
+        # Offline: serve the stale copy if there is one
+        if cached:
+            with open(body_path, 'rb') as f:
+                return f.read()
+        raise
+
+    # Not modified: keep body and refresh timestamp
+    if response.status_code == 304 and cached:
+        meta['fetched'] = time.time()
+        write_atomic(meta_path, json.dumps(meta).encode())
+        with open(body_path, 'rb') as f:
+            return f.read()
+
+    # New content: store body and metadata
+    content = response.content
+    digest = hashlib.sha256(content).hexdigest()
+    body_path = cache_path('objects', digest)
+    if not os.path.exists(body_path):
+        write_atomic(body_path, content)
+    meta = {
+        'url': url,
+        'sha256': digest,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'fetched': time.time()
+    }
+    write_atomic(meta_path, json.dumps(meta).encode())
+    return content
@@ -0,0 +1,53 @@
+# Libraries
+# =====================================================================
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from utils.http import session
+
+# Configuration
+# =====================================================================
+URL = 'https://www.imf.org/external/datamapper/api/v1/{parameter}'
+
+# Function to decode one {country: {year: value}} mapping into arrays
+def decode_values(mapping):
+    countries = np.array(list(mapping.keys()), dtype=object)
+    sizes = np.fromiter((len(years) for years in mapping.values()), dtype=np.int64, count=len(countries))
+    total = int(sizes.sum())
+    iso3 = np.repeat(countries, sizes)
+    year = np.fromiter((int(y) for years in mapping.values() for y in years), dtype=np.int64, count=total)
+    value = np.fromiter((np.nan if v is None else float(v) for years in mapping.values() for v in years.values()), dtype=np.float64, count=total)
+    return iso3, year, value
+
+# Function to download IMF DataMapper parameters as a wide (ISO3, Year) dataframe
+def fetch_imf(parameters, s=None, workers=8, timeout=60):
+    s = s or session(pool=max(workers, 1))
+
+    # Request every parameter concurrently over the same pooled session
+    def get(parameter):
+        response = s.get(URL.format(parameter=parameter), timeout=timeout)
+        response.raise_for_status()
+        return decode_values(response.json().get('values', {}).get(parameter, {}))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        decoded = list(executor.map(get, parameters))
+
+    # Encode (ISO3, Year) as one integer key and take the union of keys
+    iso3 = np.concatenate([d[0] for d in decoded]) if decoded else np.array([], dtype=object)
+    year = np.concatenate([d[1] for d in decoded]) if decoded else np.array([], dtype=np.int64)
+    codes, countries = pd.factorize(iso3, sort=True)
+    base = int(year.max()) + 1 if len(year) else 1
+    keys, inverse = np.unique(codes * base + year, return_inverse=True)
+
+    # Scatter every parameter into its column of the wide matrix
+    matrix = np.full((len(keys), len(parameters)), np.nan)
+    start = 0
+    for j, (_, _, value) in enumerate(decoded):
+        matrix[inverse[start:start + len(value)], j] = value
+        start += len(value)
+
+    # Build dataframe
+    df = pd.DataFrame(matrix, columns=list(parameters))
+    df.insert(0, 'ISO3', np.asarray(countries, dtype=object)[keys // base])
+    df.insert(1, 'Year', keys % base)
+    return df
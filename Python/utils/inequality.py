@@ -0,0 +1,270 @@
+# Libraries
+# =====================================================================
+import numpy as np
+import pandas as pd
+
+# Synthetic Distribution
+# =====================================================================
+# Function to spread each row into a geomspace(1, spread, n) distribution with the row mean,
+# where n is the population in units (one per million); blocks of units are summarised on
+# a quantile grid, so memory grows with rows x grid instead of with people (grid=None: one
+# block per unit, the exact expansion)
+def spread_distribution(df, mean, population, spread=10, grid=100):
+    n = df[population].to_numpy().astype(int)
+    df = df[n > 0]
+    n = n[n > 0]
+    k = n if grid is None else np.minimum(n, grid)
+
+    # One output row per block: block j of a group covers units [n*j/k, n*(j+1)/k)
+    rows = np.repeat(np.arange(len(df)), k)
+    start = np.repeat(np.cumsum(k) - k, k)
+    j = np.arange(len(rows)) - start
+    nr, kr = n[rows], k[rows]
+    lo = (nr * j) // kr
+    hi = (nr * (j + 1)) // kr
+
+    # Geometric sums S(m) = sum of r**i for i < m, with r = spread ** (1 / (n - 1))
+    ratio = np.where(nr > 1, np.power(float(spread), 1 / np.maximum(nr - 1, 1)), 1.0)
+    def geometric_sum(m):
+        return np.where(ratio > 1, (np.power(ratio, m) - 1) / np.where(ratio > 1, ratio - 1, 1), m)
+
+    # Scale so that every group keeps its mean
+    scale = df[mean].to_numpy(dtype=float)[rows] * nr / geometric_sum(nr)
+    weight = hi - lo
+    value = scale * (geometric_sum(hi) - geometric_sum(lo)) / weight
+
+    # Build dataframe
+    df = df.iloc[rows].reset_index(drop=True)
+    df['value'] = value
+    df['weight'] = weight
+    return df
+
+# Lorenz Curve
+# =====================================================================
+# Function to get Lorenz coordinates and Gini of weighted values sorted in ascending order
+def lorenz(values, weights=None):
+    x = np.asarray(values, dtype=float)
+    w = np.ones(len(x)) if weights is None else np.asarray(weights, dtype=float)
+    pop_cum = np.cumsum(w) / w.sum()
+    value_cum = np.cumsum(x * w) / np.sum(x * w)
+
+    # Trapezoids under the Lorenz curve
+    gini = 1 - np.sum(np.diff(pop_cum, prepend=0) * (value_cum + np.concatenate([[0], value_cum[:-1]])))
+    return pop_cum, value_cum, gini
+
+# Groups
+# =====================================================================
+# Function to get the group codes of the rows and the distinct groups (a single group when
+# there are no groups); null groups have no code, so they are rejected
+def factorize_groups(values, groups):
+    n = len(np.asarray(values))
+    codes, uniques = pd.factorize(np.zeros(n) if groups is None else pd.Series(np.asarray(groups)))
+    if (codes < 0).any():
+        raise ValueError('groups contain null values')
+    return codes, uniques
+
+# Function to shape a per-group result: a scalar without groups, else the value of each
+# row's group aligned with the values
+def broadcast(result, codes, values, groups):
+    if groups is None:
+        return result[0] if len(result) else np.nan
+    return pd.Series(result[codes], index=getattr(values, 'index', None))
+
+# Gini Index
+# =====================================================================
+# Function to get the Gini index of many groups at once: one lexsort on (group, value)
+# and segmented cumulative sums; returns a scalar without groups, else the Gini of each
+# row's group aligned with the values
+def gini(values, groups=None, weights=None):
+    x = np.asarray(values, dtype=float)
+    w = np.ones(len(x)) if weights is None else np.asarray(weights, dtype=float)
+    codes, uniques = factorize_groups(values, groups)
+
+    # Sort once by group and value
+    order = np.lexsort((x, codes))
+    xs, ws, cs = x[order], w[order], codes[order]
+
+    # Cumulative sums restarted at every group boundary (nulls only void their own group)
+    xw = xs * ws
+    missing = np.isnan(xw)
+    xw[missing] = 0
+    cum = np.cumsum(xw)
+    first = np.flatnonzero(np.r_[True, cs[1:] != cs[:-1]])
+    sizes = np.diff(np.r_[first, len(cs)])
+    cum -= np.repeat(cum[first] - xw[first], sizes)
+
+    # Sum of population share x (previous + current Lorenz height) by group
+    total_w = np.bincount(cs, weights=ws, minlength=len(uniques))
+    total_xw = np.bincount(cs, weights=xw, minlength=len(uniques))
+    area = np.bincount(cs, weights=ws * (2 * cum - xw), minlength=len(uniques))
+    result = 1 - area / (total_w * total_xw)
+    result[np.bincount(cs, weights=missing, minlength=len(uniques)) > 0] = np.nan
+
+    return broadcast(result, codes, values, groups)
+
+# Weighted Statistics
+# =====================================================================
+# Function to get the weighted mean of many groups at once (np.average by group)
+def weighted_mean(values, weights, groups=None):
+    x = np.asarray(values, dtype=float)
+    w = np.asarray(weights, dtype=float)
+    codes, uniques = factorize_groups(values, groups)
+    result = np.bincount(codes, weights=x * w, minlength=len(uniques)) / np.bincount(codes, weights=w, minlength=len(uniques))
+    return broadcast(result, codes, values, groups)
+
+# Function to get the weighted (population) standard deviation of many groups at once
+def weighted_std(values, weights, groups=None):
+    x = np.asarray(values, dtype=float)
+    w = np.asarray(weights, dtype=float)
+    codes, uniques = factorize_groups(values, groups)
+    total = np.bincount(codes, weights=w, minlength=len(uniques))
+    mean = np.bincount(codes, weights=x * w, minlength=len(uniques)) / total
+    result = np.sqrt(np.bincount(codes, weights=w * (x - mean[codes]) ** 2, minlength=len(uniques)) / total)
+    return broadcast(result, codes, values, groups)
+
+# Function to get the weighted quantile q of many groups at once: the quantile (linear
+# interpolation) of the population where each row counts `weight` times, as with np.repeat,
+# from one sort by group and value; null values are left out
+def weighted_quantile(values, weights, q, groups=None):
+    x = np.asarray(values, dtype=float)
+    w = np.where(np.isnan(x), 0, np.asarray(weights, dtype=float))
+    codes, uniques = factorize_groups(values, groups)
+
+    # Sort once by group and value; running weight across all groups
+    order = np.lexsort((x, codes))
+    xs, ws = x[order], w[order]
+    cum = np.cumsum(ws)
+    total = np.bincount(codes, weights=w, minlength=len(uniques))
+    offset = np.cumsum(total) - total
+
+    # Units floor(h) and ceil(h) of each group, h = q * (population - 1), and their rows
+    h = q * np.maximum(total - 1, 0)
+    lo = np.searchsorted(cum, offset + np.floor(h), side='right')
+    hi = np.searchsorted(cum, offset + np.ceil(h), side='right')
+    lo, hi = np.minimum(lo, len(xs) - 1), np.minimum(hi, len(xs) - 1)
+    result = xs[lo] + (h - np.floor(h)) * (xs[hi] - xs[lo])
+    result[total <= 0] = np.nan
+    return broadcast(result, codes, values, groups)
+
+# Bucket Distribution
+# =====================================================================
+# Function to get the share of a log-uniform piece's total held below position v in [0, 1]
+# of its population, where ratio is its highest over its lowest value
+def piece_share(ratio, v):
+    ratio, v = np.asarray(ratio, dtype=float), np.asarray(v, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ratio > 1, (np.power(ratio, v) - 1) / (ratio - 1), v)
+
+# Function to turn reported balance buckets [start, end) with their count and total into
+# log-uniform pieces rescaled to each bucket's total; addresses below `minimum` are cut
+# analytically, so no per-address rows are built. Buckets must be ordered by balance
+def bucket_distribution(start, end, count, total, minimum=None):
+    a, b = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+    n, t = np.asarray(count, dtype=float), np.asarray(total, dtype=float)
+
+    # Scale so that the mean of a log-uniform [a, b) matches each bucket's average
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_mean = np.where(b > a, (b - a) / np.log(b / a), a)
+        scale = np.where(n > 0, t / n / log_mean, 1)
+    low, high = a * scale, b * scale
+
+    # Cut below the minimum: keep the upper part of each piece
+    if minimum is not None:
+        cut = np.clip(minimum, low, high)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kept = np.where(high > low, 1 - np.log(cut / low) / np.log(high / low), (low >= minimum).astype(float))
+        low, n = cut, n * kept
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = n * np.where(high > low, (high - low) / np.log(high / low), low)
+
+    pieces = pd.DataFrame({'low': low, 'high': high, 'count': n, 'total': t})
+    return pieces[pieces['count'] > 0].reset_index(drop=True)
+
+# Function to get the total held below each population rank of the pieces
+def bucket_cumulative(pieces, ranks):
+    n = pieces['count'].to_numpy()
+    t = pieces['total'].to_numpy()
+    ratio = (pieces['high'] / pieces['low']).to_numpy()
+    count_end = np.cumsum(n)
+    total_start = np.cumsum(t) - t
+    k = np.minimum(np.searchsorted(count_end, ranks, side='right'), len(n) - 1)
+    v = np.clip((ranks - (count_end[k] - n[k])) / n[k], 0, 1)
+    return total_start[k] + t[k] * piece_share(ratio[k], v)
+
+# Function to split the pieces into equal-count quantile groups (1..groups) with their
+# count, total and average
+def bucket_percentiles(pieces, groups=100):
+    edges = pieces['count'].sum() * np.arange(groups + 1) / groups
+    cumulative = bucket_cumulative(pieces, edges)
+    df = pd.DataFrame({
+        'percentile': np.arange(1, groups + 1),
+        'count': np.diff(edges),
+        'total': np.diff(cumulative)
+    })
+    df['average'] = df['total'] / df['count']
+    return df
+
+# Function to get the exact Gini index of the pieces: the area under each piece's Lorenz
+# segment has a closed form
+def bucket_gini(pieces):
+    n = pieces['count'].to_numpy()
+    t = pieces['total'].to_numpy()
+    ratio = (pieces['high'] / pieces['low']).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_share = np.where(ratio > 1, 1 / np.log(ratio) - 1 / (ratio - 1), 0.5)
+    area = np.sum(n / n.sum() * (np.cumsum(t) - t + t * mean_share)) / t.sum()
+    return 1 - 2 * area
+
+# Function to draw a stratified sample of addresses from the pieces (for plotting)
+def bucket_sample(pieces, size=100000):
+    n = pieces['count'].to_numpy()
+    ranks = (np.arange(size) + 0.5) / size * n.sum()
+    count_end = np.cumsum(n)
+    k = np.minimum(np.searchsorted(count_end, ranks, side='right'), len(n) - 1)
+    v = (ranks - (count_end[k] - n[k])) / n[k]
+    return pieces['low'].to_numpy()[k] * np.power((pieces['high'] / pieces['low']).to_numpy()[k], v)
+
+# Weighted Binning
+# =====================================================================
+# Function to split weighted values (bucket midpoints and counts, country means and
+# populations...) into bins of equal weight after sorting by value, like pd.qcut on the rows
+# repeated by their weights; rows across a bin edge are split between both bins. Returns the
+# bin of each row (where the middle of its weight falls, 1..bins; 0 for null values) and the
+# weight, total (value x weight) and mean of every bin. ranked=True keeps the given order
+# for rows that already come ranked (percentile rows, ordered buckets)
+def weighted_bins(values, weights=None, bins=100, groups=None, ranked=False):
+    x = np.asarray(values, dtype=float)
+    w = np.ones(len(x)) if weights is None else np.asarray(weights, dtype=float)
+    w = np.where(np.isnan(x), 0, w)
+    codes, uniques = factorize_groups(values, groups)
+
+    # Sort once by group and value (ties keep their order); running sums across all groups
+    order = np.argsort(codes, kind='stable') if ranked else np.lexsort((x, codes))
+    xs, ws, cs = np.nan_to_num(x[order]), w[order], codes[order]
+    cum = np.cumsum(ws)
+    cum_xw = np.cumsum(xs * ws)
+    total = np.bincount(codes, weights=w, minlength=len(uniques))
+    offset = np.cumsum(total) - total
+
+    # Running total at every bin edge of every group, interpolated inside the row it falls in
+    edges = offset[:, None] + total[:, None] * np.arange(bins + 1) / bins
+    k = np.minimum(np.searchsorted(cum, edges, side='right'), len(xs) - 1)
+    at = cum_xw[k] - xs[k] * ws[k] + (edges - (cum[k] - ws[k])) * xs[k]
+
+    # Bin summary
+    summary = pd.DataFrame({
+        'bin': np.tile(np.arange(1, bins + 1), len(uniques)),
+        'weight': np.diff(edges, axis=1).ravel(),
+        'total': np.diff(at, axis=1).ravel()
+    })
+    summary['mean'] = summary['total'] / summary['weight']
+    if groups is not None:
+        summary.insert(0, 'group', np.repeat(np.asarray(uniques), bins))
+
+    # Bin of each row by the middle of its weight
+    with np.errstate(divide='ignore', invalid='ignore'):
+        middle = (cum - ws / 2 - offset[cs]) / total[cs]
+    member = np.where(ws > 0, np.clip(np.floor(middle * bins).astype(np.int64) + 1, 1, bins), 0)
+    membership = np.empty(len(x), dtype=np.int64)
+    membership[order] = member
+    return pd.Series(membership, index=getattr(values, 'index', None)), summary
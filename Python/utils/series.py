@@ -0,0 +1,256 @@
+# Libraries
+# =====================================================================
+import numpy as np
+import pandas as pd
+
+# Configuration
+# =====================================================================
+WINDOWS = [10, 20, 50, 100, 200, 300]
+
+# Decimals of the currency table columns and their types (changesign as a sign code)
+DECIMALS = {
+    'open': 5, 'close': 5, 'low': 5, 'high': 5, 'volume': 0, 'change': 5, 'changepercent': 5,
+    'ma10': 5, 'ma20': 5, 'ma50': 5, 'ma100': 5, 'ma200': 5, 'ma300': 5
+}
+SCHEMA = {**{c: np.float64 for c in DECIMALS}, 'changesign': np.int8}
+
+# Function to get the start of every group segment of group-sorted codes
+def segments(codes):
+    codes = np.asarray(codes)
+    first = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=np.int64)
+    return first, np.r_[first[1:], len(codes)].astype(np.int64)
+
+# Function to get integer group codes (a single group when there are no groups)
+def group_codes(groups, n):
+    if groups is None:
+        return np.zeros(n, dtype=np.int64)
+    return pd.factorize(pd.Series(np.asarray(groups)))[0]
+
+# Outlier Filter
+# =====================================================================
+# Function to drop spikes in one pass: each value is accepted when its ratio to the last
+# accepted value of its group lies in (lower, upper); after `patience` rejections in a row
+# the next value is taken as a new level (None: never). Rows must be in date order within
+# each group. Returns the keep mask and the state {group: (last, rejects)}, which can be
+# passed back as `state` to filter the next batch of a stream
+def filter_outliers(values, groups=None, lower=0.2, upper=1.8, patience=None, state=None):
+    x = np.asarray(values, dtype=float)
+    codes, uniques = (np.zeros(len(x), dtype=np.int64), None) if groups is None else pd.factorize(pd.Series(np.asarray(groups)))
+    state = dict(state or {})
+
+    # Stable sort by group keeps the date order inside each group
+    order = np.argsort(codes, kind='stable')
+    xs = x[order]
+    first, last_row = segments(codes[order])
+
+    # Runs of consecutive rows inside the band are accepted in bulk, so Python only
+    # steps through the rows that break the chain
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = xs[1:] / xs[:-1]
+    breaks = np.flatnonzero(~((ratio > lower) & (ratio < upper))) + 1
+    keep = np.zeros(len(xs), dtype=bool)
+
+    for start, end in zip(first, last_row):
+        key = None if groups is None else uniques[codes[order[start]]]
+        last, rejects = state.get(key, (np.nan, 0))
+        i = start
+        while i < end:
+            v = xs[i]
+            if np.isnan(v):
+                i += 1
+                continue
+            with np.errstate(divide='ignore', invalid='ignore'):
+                r = v / last
+            if not (np.isnan(last) or lower < r < upper or (patience is not None and rejects >= patience)):
+                rejects += 1
+                i += 1
+                continue
+
+            # Accept v and every following row chained to its predecessor
+            j = breaks[np.searchsorted(breaks, i, side='right'):][:1]
+            j = min(int(j[0]), end) if len(j) else end
+            keep[i:j] = True
+            last, rejects = xs[j - 1], 0
+            i = j
+        state[key] = (last, rejects)
+
+    # Back to the input order
+    mask = np.empty(len(x), dtype=bool)
+    mask[order] = keep
+    return mask, state
+
+# Rolling Statistics
+# =====================================================================
+# Function to get cumulative sums restarted at every group
+def cumulative(x, first, end):
+    cum = np.empty(len(x))
+    for a, b in zip(first, end):
+        cum[a:b] = np.cumsum(x[a:b])
+    return cum
+
+# Function to get the sums of the windows [lo, row] from restarted cumulative sums
+def window_sum(cum, start, lo):
+    return cum - np.where(lo > start, cum[np.maximum(lo - 1, 0)], 0)
+
+# Function to get the rolling min or max of windows cut at group starts (van Herk / Gil-Werman):
+# blocks of w rows from each group start, prefix and suffix extremes per block, and every window
+# is covered by the suffix of its first block plus the prefix of its last one
+def rolling_extreme(x, start, lo, w, how):
+    pos = np.arange(len(x))
+    v = np.where(np.isnan(x), np.inf if how == 'min' else -np.inf, x)
+    block = np.cumsum(((pos - start) % w == 0) | (pos == start))
+    prefix = getattr(pd.Series(v).groupby(block), f'cum{how}')().to_numpy()
+    suffix = getattr(pd.Series(v[::-1]).groupby(block[::-1]), f'cum{how}')().to_numpy()[::-1]
+    pick = np.minimum if how == 'min' else np.maximum
+    result = np.where(block[lo] == block, prefix, pick(suffix[lo], prefix))
+    return np.where(np.isinf(result), np.nan, result)
+
+# Function to get rolling statistics of several windows in one pass over rows sorted by group
+# and date, like rolling(w, min_periods=1) within each group; columns ma10, std10, min10, ...
+def rolling_stats(values, windows=WINDOWS, groups=None, stats=('mean',)):
+    x = np.asarray(values, dtype=float)
+    n = len(x)
+    first, end = segments(group_codes(groups, n))
+    start = np.repeat(first, end - first)
+    pos = np.arange(n)
+    valid = ~np.isnan(x)
+
+    # Centred on the first value of each group so the sums stay small
+    base = pd.Series(x).groupby(start).transform('first').fillna(0).to_numpy()
+    z = np.where(valid, x - base, 0)
+    c0 = cumulative(valid.astype(float), first, end)
+    c1 = cumulative(z, first, end)
+    c2 = cumulative(z * z, first, end) if 'std' in stats else None
+
+    result = {}
+    for w in windows:
+        lo = np.maximum(pos - w + 1, start)
+        count = window_sum(c0, start, lo)
+        s1 = window_sum(c1, start, lo)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(count > 0, s1 / count, np.nan)
+            if 'mean' in stats:
+                result[f'ma{w}'] = mean + base
+            if 'std' in stats:
+                var = (window_sum(c2, start, lo) - s1 * mean) / (count - 1)
+                result[f'std{w}'] = np.where(count > 1, np.sqrt(np.maximum(var, 0)), np.nan)
+        for how in ('min', 'max'):
+            if how in stats:
+                result[f'{how}{w}'] = rolling_extreme(x, start, lo, w, how)
+    return pd.DataFrame(result, index=getattr(values, 'index', None))
+
+# Function to get exponential moving averages (ewm(span, adjust=False) within each group)
+def ema(values, spans=WINDOWS, groups=None):
+    x = pd.Series(np.asarray(values, dtype=float))
+    codes = group_codes(groups, len(x))
+    result = {}
+    for span in spans:
+        e = x.groupby(codes, sort=False).ewm(span=span, adjust=False).mean()
+        result[f'ema{span}'] = e.reset_index(level=0, drop=True).sort_index().to_numpy()
+    return pd.DataFrame(result, index=getattr(values, 'index', None))
+
+# Daily Calendar
+# =====================================================================
+# Function to densify rows to one per group and day between the first and last date of each
+# group; days without data repeat the last row of their group (resample('D').ffill()).
+# Returns the rows sorted by group and date
+def densify(df, group, date):
+    df = df.sort_values([group, date], kind='stable').reset_index(drop=True)
+    days = df[date].to_numpy().astype('datetime64[D]')
+    first, end = segments(pd.factorize(df[group])[0])
+
+    # Grid of every (group, day) from each group's first to last date
+    lo = days[first]
+    sizes = (days[end - 1] - lo).astype(np.int64) + 1
+    offset = np.cumsum(sizes) - sizes
+    grid = np.arange(sizes.sum()) - np.repeat(offset, sizes)
+    grid_days = np.repeat(lo, sizes) + grid
+
+    # Source row of each grid day, propagated forward over the gaps (the first day of every
+    # group has data, so nothing leaks across groups); repeated dates keep the last row
+    slot = np.repeat(offset, end - first) + (days - np.repeat(lo, end - first)).astype(np.int64)
+    source = np.zeros(len(grid), dtype=np.int64)
+    has = np.zeros(len(grid), dtype=bool)
+    source[slot] = np.arange(len(df))
+    has[slot] = True
+    source = source[np.maximum.accumulate(np.where(has, np.arange(len(grid)), 0))]
+
+    # Build dataframe
+    df = df.iloc[source].reset_index(drop=True)
+    df[date] = grid_days.astype(df[date].dtype)
+    return df
+
+# Panel Interpolation
+# =====================================================================
+# Function to turn an annual panel into a monthly one (month ends from January of each group's
+# first year to January of its last), interpolating linearly between the known years of each
+# group and column and repeating the last known value after it; columns in `log` are
+# interpolated in logs (constant growth rate), for GDP-like series
+def interpolate_panel(df, group, year, columns, date='Date', log=()):
+    df = df.groupby([group, year], sort=True, observed=True)[list(columns)].mean().reset_index()
+    codes, uniques = pd.factorize(df[group])
+    first, end = segments(codes)
+    years = df[year].to_numpy().astype(np.int64)
+
+    # Monthly grid of every group
+    start = years[first]
+    sizes = (years[end - 1] - start) * 12 + 1
+    grid_codes = np.repeat(np.arange(len(first)), sizes)
+    grid = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    months = np.repeat(start - 1970, sizes) * 12 + grid
+    dates = (months + 1).astype('datetime64[M]').astype('datetime64[D]') - np.timedelta64(1, 'D')
+
+    # Position of the known years on the grid; keys keep groups apart in one sorted array
+    span = int(sizes.max()) + 1 if len(sizes) else 1
+    position = (years - np.repeat(start, end - first)) * 12
+    grid_key = grid_codes * span + grid
+
+    result = pd.DataFrame({
+        group: uniques.take(grid_codes),
+        year: dates.astype('datetime64[Y]').astype(np.int64) + 1970,
+        date: dates.astype('datetime64[ns]')
+    })
+    for column in columns:
+        values = df[column].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.log(values) if column in log else values
+        known = ~np.isnan(values)
+        key, y, c = (codes * span + position)[known], values[known], codes[known]
+
+        # Known year at or before each month, and the next one
+        i = np.searchsorted(key, grid_key, side='right') - 1
+        j = np.minimum(i + 1, len(key) - 1)
+        left = (i >= 0) & (c[np.maximum(i, 0)] == grid_codes)
+        right = left & (j > i) & (c[j] == grid_codes)
+        i = np.maximum(i, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (y[j] - y[i]) / (key[j] - key[i])
+            value = np.where(right, y[i] + slope * (grid_key - key[i]), np.where(left, y[i], np.nan))
+        result[column] = np.exp(value) if column in log else value
+    return result
+
+# Derived Metrics
+# =====================================================================
+# Function to add the change of each row against the previous price of its group (or its
+# open on the first day, which then becomes the previous price), the sign code (1 up, -1 down,
+# 0 flat) and the table types, rounding all the columns that share decimals at once
+def derive_metrics(df, price, group=None, open=None):
+    df = df.copy()
+    p = df[price].to_numpy(dtype=float)
+    first, _ = segments(group_codes(None if group is None else df[group], len(df)))
+    previous = np.r_[np.nan, p[:-1]]
+    previous[first] = np.nan
+    if open is not None:
+        previous = np.where(np.isnan(previous), df[open].to_numpy(dtype=float), previous)
+        df[open] = previous
+
+    change = p - previous
+    df['change'] = change
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['changepercent'] = change / previous
+    df['changesign'] = np.sign(np.nan_to_num(change)).astype(np.int8)
+
+    for decimals in sorted(set(DECIMALS.values())):
+        columns = [c for c, d in DECIMALS.items() if d == decimals and c in df.columns]
+        df[columns] = np.round(df[columns].to_numpy(dtype=float), decimals)
+    return df.astype({c: t for c, t in SCHEMA.items() if c in df.columns})
@@ -0,0 +1,66 @@
+# Libraries
+# =====================================================================
+import numpy as np
+import pandas as pd
+
+# Configuration
+# =====================================================================
+DIRECTIONS = ['down', 'up']
+
+# Run Lengths
+# =====================================================================
+# Function to encode a sign series as runs (rows sorted by group and date): for every row,
+# its position inside its run (1 = first day) and the length of the run; zeros and group
+# changes break runs
+def run_lengths(sign, codes):
+    sign = np.asarray(sign)
+    codes = np.asarray(codes)
+    n = len(sign)
+    new = np.r_[True, (sign[1:] != sign[:-1]) | (codes[1:] != codes[:-1])] if n else np.zeros(0, dtype=bool)
+    run = np.cumsum(new) - 1
+    starts = np.flatnonzero(new)
+    lengths = np.diff(np.r_[starts, n])
+    return np.arange(n) - starts[run] + 1, lengths[run]
+
+# Streak Probabilities
+# =====================================================================
+# Function to get P(streak >= days + extra | streak >= days) for every days <= max_days and
+# extra <= max_extra, both directions, every group and, optionally, every value of `by`
+# (day of week, month...) on the day the streak reaches `days`. Rows must be sorted by group
+# and date; the sign of `value` gives the direction of each day
+def streak_probabilities(df, value, group=None, by=None, max_days=10, max_extra=5):
+    sign = np.sign(df[value].to_numpy(dtype=float))
+    sign = np.where(np.isnan(sign), 0, sign).astype(np.int8)
+    codes, groups = pd.factorize(df[group]) if group is not None else (np.zeros(len(df), dtype=np.int64), pd.Index(['all']))
+    by_codes, by_values = pd.factorize(df[by], sort=True) if by is not None else (np.zeros(len(df), dtype=np.int64), pd.Index(['all']))
+    position, length = run_lengths(sign, codes)
+
+    # One count per (group, direction, by, days, remaining days of the run)
+    keep = (sign != 0) & (position <= max_days) & (by_codes >= 0)
+    shape = (len(groups), 2, len(by_values), max_days, max_extra + 1)
+    remaining = np.minimum(length - position, max_extra)
+    index = np.ravel_multi_index(((codes[keep]), (sign[keep] > 0).astype(np.int64), by_codes[keep], position[keep] - 1, remaining[keep]), shape)
+    counts = np.bincount(index, minlength=int(np.prod(shape))).reshape(shape)
+
+    # Reached: streaks at `days`; continued: those with at least `extra` days more
+    reached = counts.sum(axis=-1)
+    continued = counts[..., ::-1].cumsum(axis=-1)[..., ::-1][..., 1:]
+
+    # Tidy dataframe
+    g, d, b, k, e = np.indices(continued.shape).reshape(5, -1)
+    result = pd.DataFrame({
+        group or 'group': groups.take(g),
+        'direction': np.array(DIRECTIONS).take(d),
+        by or 'by': by_values.take(b),
+        'days': k + 1,
+        'extra': e + 1,
+        'reached': reached[g, d, b, k],
+        'continued': continued.ravel()
+    })
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['probability'] = np.where(result['reached'] > 0, result['continued'] / result['reached'], np.nan)
+    if by is None:
+        result = result.drop(columns='by')
+    if group is None:
+        result = result.drop(columns='group')
+    return result
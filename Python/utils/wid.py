@@ -0,0 +1,187 @@
+# Libraries
+# =====================================================================
+import io
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+from utils.http import session, cached_get
+
+# Configuration
+# =====================================================================
+COLUMNS = ['country', 'variable', 'percentile', 'year', 'value']
+DTYPES = {'country': str, 'variable': str, 'percentile': str, 'year': np.int16, 'value': np.float64}
+CHUNKSIZE = 500000
+
+# Percentile labels like p42p43 or p99.9p100
+PERCENTILE = r'^p(\d+(?:\.\d+)?)p(\d+(?:\.\d+)?)$'
+
+# Parquet dataset layout
+MANIFEST = '_manifest.json'
+ROW_GROUP_SIZE = 5000
+
+# Function to read one WID_data_*.csv keeping only the rows that pass the filters
+def read_file(path, variables=None, percentiles=None, years=None, countries=None, chunksize=CHUNKSIZE):
+    parts = []
+    reader = pd.read_csv(path, delimiter=';', usecols=COLUMNS, dtype=DTYPES, chunksize=chunksize)
+    for chunk in reader:
+        mask = np.ones(len(chunk), dtype=bool)
+        if variables is not None:
+            mask &= chunk['variable'].isin(variables).to_numpy()
+        if percentiles is not None:
+            mask &= chunk['percentile'].isin(percentiles).to_numpy()
+        if years is not None:
+            mask &= chunk['year'].isin(years).to_numpy()
+        if countries is not None:
+            mask &= chunk['country'].isin(countries).to_numpy()
+        if mask.any():
+            parts.append(chunk[mask])
+    return pd.concat(parts, ignore_index=True) if parts else None
+
+# Function to parse percentile labels into bounds, decoding each distinct label once
+def parse_percentiles(labels):
+    labels = pd.Series(labels)
+    labels = labels if isinstance(labels.dtype, pd.CategoricalDtype) else labels.astype('category')
+    categories = labels.cat.categories.astype(str).to_series()
+
+    # Bounds of the distinct labels, plus a trailing NaN row for missing labels (code -1)
+    bounds = categories.str.extract(PERCENTILE).astype(np.float32).to_numpy()
+    bounds = np.vstack([bounds, np.full((1, 2), np.nan, dtype=np.float32)])
+    fractional = np.append(categories.str.contains('.', regex=False).to_numpy(), False)
+
+    # Map back to the rows through the categorical codes
+    codes = labels.cat.codes.to_numpy()
+    lower, upper = bounds[codes, 0], bounds[codes, 1]
+    return pd.DataFrame({
+        'lower': lower,
+        'upper': upper,
+        'width': upper - lower,
+        'fractional': fractional[codes]
+    }, index=labels.index)
+
+# Function to read the WID bulk export with filters applied while parsing
+def read_wid(path, variables=None, percentiles=None, years=None, countries=None, workers=None, value_dtype=np.float64):
+    variables = None if variables is None else set(variables)
+    percentiles = None if percentiles is None else set(percentiles)
+    years = None if years is None else set(int(y) for y in years)
+    countries = None if countries is None else set(countries)
+
+    # One file per country: skip the files of countries that are filtered out
+    files = []
+    for archivo in sorted(os.listdir(path)):
+        if archivo.startswith("WID_data_") and archivo.endswith(".csv"):
+            if countries is None or archivo[len("WID_data_"):-len(".csv")] in countries:
+                files.append(os.path.join(path, archivo))
+
+    # The C parser releases the GIL while tokenizing, so threads use every core
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        parts = list(executor.map(lambda f: read_file(f, variables, percentiles, years, countries), files))
+    parts = [p for p in parts if p is not None]
+    if not parts:
+        return pd.DataFrame({c: pd.Series(dtype=DTYPES[c]) for c in COLUMNS})
+
+    # Compact dtypes
+    df = pd.concat(parts, ignore_index=True)
+    df = df.astype({'country': 'category', 'variable': 'category', 'percentile': 'category', 'value': value_dtype})
+    return df
+
+# Parquet Dataset
+# =====================================================================
+# Function to write a dataframe as a Hive-partitioned parquet dataset (year=YYYY[/country=XX]/part-0.parquet)
+def write_dataset(df, root, partition_cols=('year',), row_group_size=ROW_GROUP_SIZE):
+    partition_cols = list(partition_cols)
+    columns = list(df.columns)
+
+    # Sorted by country inside each partition so row-group statistics can skip countries
+    df = df.astype({'country': 'category'})
+    order = [c for c in ['country', 'percentile'] if c in columns and c not in partition_cols]
+    df = df.sort_values(partition_cols + order)
+
+    # Write into a temporary folder and swap it at the end
+    tmp = f'{root}.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    files = []
+    for key, part in df.groupby(partition_cols, sort=True, observed=True):
+        key = key if isinstance(key, tuple) else (key,)
+        values = {c: v.item() if hasattr(v, 'item') else v for c, v in zip(partition_cols, key)}
+        rel = '/'.join(f'{c}={v}' for c, v in values.items()) + '/part-0.parquet'
+        os.makedirs(os.path.dirname(os.path.join(tmp, rel)), exist_ok=True)
+        part = part.drop(columns=partition_cols)
+        if 'country' in part.columns:
+            part['country'] = part['country'].cat.remove_unused_categories()
+        table = pa.Table.from_pandas(part, preserve_index=False)
+        # Dictionary pages only pay off for repeated keys, not for measures
+        keys = [c for c in part.columns if not pd.api.types.is_float_dtype(part[c])]
+        pq.write_table(table, os.path.join(tmp, rel), row_group_size=row_group_size, write_statistics=True, compression='zstd', use_dictionary=keys)
+        files.append({'path': rel, **values})
+
+    # Manifest: lets remote readers prune partitions without listing folders
+    manifest = {
+        'columns': columns,
+        'partitioning': partition_cols,
+        'dtypes': {c: str(df[c].dtype) for c in partition_cols},
+        'files': files
+    }
+    with open(os.path.join(tmp, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1)
+    shutil.rmtree(root, ignore_errors=True)
+    os.replace(tmp, root)
+
+# Function to read a WID parquet dataset (folder or URL) touching only the partitions needed
+def read_dataset(source, years=None, countries=None, columns=None, workers=8, ttl=86400):
+    remote = source.startswith(('http://', 'https://'))
+    s = session(pool=workers) if remote else None
+
+    # Function to open a file of the dataset
+    def open_file(rel):
+        if remote:
+            return io.BytesIO(cached_get(f"{source.rstrip('/')}/{rel}", ttl=ttl, s=s))
+        return os.path.join(source, rel)
+
+    # Read manifest
+    if remote:
+        manifest = json.load(open_file(MANIFEST))
+    else:
+        with open(open_file(MANIFEST)) as f:
+            manifest = json.load(f)
+    partitions = manifest['partitioning']
+    years = None if years is None else set(int(y) for y in years)
+    countries = None if countries is None else set(countries)
+
+    # Partition pruning
+    files = manifest['files']
+    if years is not None and 'year' in partitions:
+        files = [f for f in files if f['year'] in years]
+    if countries is not None and 'country' in partitions:
+        files = [f for f in files if f['country'] in countries]
+
+    # Column and row-group pushdown inside each file
+    wanted = manifest['columns'] if columns is None else [c for c in manifest['columns'] if c in set(columns) | {'country', 'year'}]
+    stored = [c for c in wanted if c not in partitions]
+    filters = []
+    if years is not None and 'year' not in partitions:
+        filters.append(('year', 'in', sorted(years)))
+    if countries is not None and 'country' not in partitions:
+        filters.append(('country', 'in', sorted(countries)))
+
+    # Function to read one partition and add its partition columns back
+    def read_part(f):
+        table = pq.read_table(open_file(f['path']), columns=stored, filters=filters or None)
+        df = table.to_pandas()
+        for c in partitions:
+            if c in wanted:
+                df[c] = f[c]
+        return df
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(read_part, files))
+    if not parts:
+        return pd.DataFrame({c: pd.Series(dtype=manifest['dtypes'].get(c, object)) for c in wanted})
+    df = pd.concat(parts, ignore_index=True)
+    df = df.astype({c: manifest['dtypes'][c] for c in partitions if c in wanted})
+    df['country'] = df['country'].astype('category').cat.remove_unused_categories()
+    return df[wanted]